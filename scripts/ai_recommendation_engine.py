@@ -1,15 +1,68 @@
+import hashlib
 import json
 import re
+from functools import lru_cache
+from itertools import repeat
 from typing import Dict, List, Any, Tuple
 from datetime import datetime, timedelta
 
+import numpy as np
+
+from platforms import PLATFORM_IDS, PLATFORMS, index_by_spelling, resolve
+from recommendation_catalog import expand
+from records import BreachTable, ExposureTable, index_users
+
+URGENCY_LEVELS = ['low', 'medium', 'high', 'critical']
+URGENCY_INDEX = {level: index for index, level in enumerate(URGENCY_LEVELS)}
+
+# Bits of the compiled per-user rule key
+FLAG_FINANCIAL = 1 << 0
+FLAG_AUTHENTICATION = 1 << 1
+FLAG_PERSONAL_IDENTIFIERS = 1 << 2
+FLAG_CONTACT_INFORMATION = 1 << 3
+FLAG_SECURITY_CONSCIOUS = 1 << 4
+FLAG_PASSWORD_REUSE = 1 << 5
+FLAG_TECH_SAVVY = 1 << 6
+FLAG_SOCIAL_HIGH = 1 << 7
+URGENCY_SHIFT = 8
+PLATFORM_SHIFT = 10
+
+SENSITIVITY_FLAGS = {
+    'financial_data': FLAG_FINANCIAL,
+    'authentication_data': FLAG_AUTHENTICATION,
+    'personal_identifiers': FLAG_PERSONAL_IDENTIFIERS,
+    'contact_information': FLAG_CONTACT_INFORMATION
+}
+
+# Catalog ID of the platform-specific advice, by canonical platform ID (see platforms)
+PLATFORM_RECOMMENDATIONS = {
+    platform.id: platform.recommendation for platform in PLATFORMS if platform.recommendation
+}
+
+GENERAL_SOCIAL_RECOMMENDATIONS = (
+    'social.audit_apps',
+    'social.delete_old_posts',
+    'social.disable_location'
+)
+
+# Rule key bit of each platform with specific advice
+PLATFORM_FLAGS = {
+    platform: 1 << (PLATFORM_SHIFT + bit) for bit, platform in enumerate(PLATFORM_RECOMMENDATIONS)
+}
+
+# Every registered platform by its usual spellings, so most exposures need a single probe
+PLATFORM_SPELLINGS = index_by_spelling({platform: PLATFORM_FLAGS.get(platform, 0) for platform in PLATFORM_IDS})
+
 class AIRecommendationEngine:
     """
     AI-powered recommendation system for digital footprint security
     Uses rule-based AI and pattern matching to generate personalized security recommendations
     """
     
-    def __init__(self):
+    def __init__(self, expand_recommendations: bool = True):
+        # Return recommendation text, or catalog IDs (see recommendation_catalog) when False
+        self.expand_recommendations = expand_recommendations
+        
         # Knowledge base of security recommendations
         self.recommendation_templates = {
             'password_security': {
@@ -73,6 +126,15 @@ class AIRecommendationEngine:
             'high_risk_platforms': ['dating', 'financial', 'healthcare', 'government'],
             'privacy_red_flags': ['location_always_on', 'public_profile', 'contact_info_visible']
         }
+        
+        # Compromised data types that mark each sensitivity category
+        self.sensitivity_categories = {
+            'financial_data': ['credit_card', 'bank_account', 'ssn'],
+            'authentication_data': ['password', 'security_question'],
+            'personal_identifiers': ['ssn', 'passport', 'drivers_license'],
+            'contact_information': ['email', 'phone', 'address']
+        }
+        self._compile_rules()
 
     def analyze_user_risk_profile(self, breach_data: List[Dict], social_data: List[Dict], 
                                 user_behavior: Dict = None) -> Dict[str, Any]:
@@ -87,9 +149,7 @@ class AIRecommendationEngine:
         }
         
         # Determine overall urgency
-        if risk_profile['breach_severity'] >= 80 or any(
-            breach.get('severity') == 'critical' for breach in breach_data
-        ):
+        if risk_profile['breach_severity'] >= 80 or self._has_critical_breach(breach_data):
             risk_profile['urgency_level'] = 'critical'
         elif risk_profile['breach_severity'] >= 60 or risk_profile['social_exposure'] >= 70:
             risk_profile['urgency_level'] = 'high'
@@ -98,16 +158,25 @@ class AIRecommendationEngine:
         
         return risk_profile
 
+    @staticmethod
+    def _has_critical_breach(breach_data: List[Dict]) -> bool:
+        if isinstance(breach_data, BreachTable):
+            return bool(breach_data.severity_weights({'critical': 1}, 0).any())
+        return any(breach.get('severity') == 'critical' for breach in breach_data)
+
     def _assess_breach_severity(self, breach_data: List[Dict]) -> int:
         """Assess severity of data breaches"""
         if not breach_data:
             return 0
         
         severity_scores = {'low': 10, 'medium': 30, 'high': 60, 'critical': 90}
-        max_severity = max(
-            severity_scores.get(breach.get('severity', 'low'), 10) 
-            for breach in breach_data
-        )
+        if isinstance(breach_data, BreachTable):
+            max_severity = int(breach_data.severity_weights(severity_scores, 10).max())
+        else:
+            max_severity = max(
+                severity_scores.get(breach.get('severity', 'low'), 10) 
+                for breach in breach_data
+            )
         
         # Factor in number of breaches
         breach_count_multiplier = min(1.5, 1 + (len(breach_data) - 1) * 0.1)
@@ -120,25 +189,31 @@ class AIRecommendationEngine:
             return 0
         
         exposure_scores = {'low': 15, 'medium': 40, 'high': 75}
-        total_score = sum(
-            exposure_scores.get(exposure.get('risk_level', 'low'), 15)
-            for exposure in social_data
-        )
+        if isinstance(social_data, ExposureTable):
+            total_score = int(social_data.risk_level_weights(exposure_scores, 15).sum())
+        else:
+            total_score = sum(
+                exposure_scores.get(exposure.get('risk_level', 'low'), 15)
+                for exposure in social_data
+            )
         
         return min(100, total_score)
 
     def _assess_data_sensitivity(self, breach_data: List[Dict]) -> Dict[str, bool]:
         """Assess what types of sensitive data were compromised"""
-        compromised_types = set()
+        flags = self._sensitivity_flags(breach_data)
+        return {category: bool(flags & flag) for category, flag in SENSITIVITY_FLAGS.items()}
+
+    def _sensitivity_flags(self, breach_data: List[Dict]) -> int:
+        """Bitmask of the sensitivity categories touched by any compromised data type"""
+        if isinstance(breach_data, BreachTable):
+            return int(np.bitwise_or.reduce(breach_data.data_type_flags(self._data_type_flags)))
+        flags = 0
+        data_type_flags = self._data_type_flags
         for breach in breach_data:
-            compromised_types.update(breach.get('data_types', []))
-        
-        return {
-            'financial_data': any(dt in compromised_types for dt in ['credit_card', 'bank_account', 'ssn']),
-            'authentication_data': any(dt in compromised_types for dt in ['password', 'security_question']),
-            'personal_identifiers': any(dt in compromised_types for dt in ['ssn', 'passport', 'drivers_license']),
-            'contact_information': any(dt in compromised_types for dt in ['email', 'phone', 'address'])
-        }
+            for data_type in breach.get('data_types', []):
+                flags |= data_type_flags.get(data_type, 0)
+        return flags
 
     def _analyze_behavioral_patterns(self, user_behavior: Dict) -> Dict[str, Any]:
         """Analyze user behavior patterns for targeted recommendations"""
@@ -149,125 +224,320 @@ class AIRecommendationEngine:
             'tech_savvy': user_behavior.get('uses_password_manager', False)
         }
 
-    def generate_personalized_recommendations(self, risk_profile: Dict, 
-                                           breach_data: List[Dict], 
-                                           social_data: List[Dict]) -> Dict[str, Any]:
-        """Generate AI-powered personalized security recommendations"""
-        
-        recommendations = {
-            'immediate_actions': [],
-            'short_term_goals': [],
-            'long_term_improvements': [],
-            'educational_resources': [],
-            'priority_score': 0
-        }
-        
-        urgency = risk_profile['urgency_level']
-        data_sensitivity = risk_profile['data_sensitivity']
-        behavioral = risk_profile['behavioral_patterns']
+    def _compile_rules(self):
+        """
+        Look up the compiled rule table (see compiled_rule_table), shared by every engine
+        in the process with the same expand_recommendations setting, and index the
+        sensitivity categories by compromised data type.
+        """
+        self._data_type_flags: Dict[str, int] = {}
+        for category, data_types in self.sensitivity_categories.items():
+            for data_type in data_types:
+                self._data_type_flags[data_type] = self._data_type_flags.get(data_type, 0) | SENSITIVITY_FLAGS[category]
+        self._platform_flags = PLATFORM_FLAGS
+        self._platform_spellings = PLATFORM_SPELLINGS
+        self._recommendation_table = compiled_rule_table(self.expand_recommendations)
+
+    @staticmethod
+    def _evaluate_rules(key: int) -> Tuple:
+        """Recommendation lists and priority score for one rule key"""
+        urgency = URGENCY_LEVELS[(key >> URGENCY_SHIFT) & 3]
+        immediate_actions, short_term_goals = [], []
         
         # Immediate actions based on urgency
         if urgency in ['critical', 'high']:
-            if data_sensitivity.get('financial_data'):
-                recommendations['immediate_actions'].extend([
-                    "🚨 URGENT: Monitor all bank and credit card accounts for unauthorized transactions",
-                    "🚨 Contact your bank immediately to report potential compromise",
-                    "🚨 Place fraud alerts on your credit reports with all three bureaus"
+            if key & FLAG_FINANCIAL:
+                immediate_actions.extend([
+                    'immediate.financial.monitor_accounts',
+                    'immediate.financial.contact_bank',
+                    'immediate.financial.fraud_alerts'
                 ])
             
-            if data_sensitivity.get('authentication_data'):
-                recommendations['immediate_actions'].extend([
-                    "🔐 Change passwords on ALL accounts immediately, starting with financial and email",
-                    "🔐 Enable two-factor authentication on every account that supports it"
+            if key & FLAG_AUTHENTICATION:
+                immediate_actions.extend([
+                    'immediate.auth.change_passwords',
+                    'immediate.auth.enable_2fa'
                 ])
         
         # Password security recommendations
-        if not behavioral.get('security_conscious'):
-            if behavioral.get('password_reuse_likely'):
-                recommendations['short_term_goals'].extend([
-                    "Install and set up a password manager (recommended: Bitwarden, 1Password)",
-                    "Generate unique passwords for each of your accounts",
-                    "Update your most important accounts first: email, banking, work"
+        if not key & FLAG_SECURITY_CONSCIOUS:
+            if key & FLAG_PASSWORD_REUSE:
+                short_term_goals.extend([
+                    'password.install_manager',
+                    'password.unique_passwords',
+                    'password.update_important_first'
                 ])
             else:
-                recommendations['short_term_goals'].append(
-                    "Consider using a password manager for better security"
+                short_term_goals.append(
+                    'password.consider_manager'
                 )
         
         # Social media privacy
-        if risk_profile['social_exposure'] > 50:
-            social_recommendations = self._generate_social_media_recommendations(social_data)
-            recommendations['short_term_goals'].extend(social_recommendations)
+        if key & FLAG_SOCIAL_HIGH:
+            short_term_goals.extend(
+                recommendation for platform, recommendation in PLATFORM_RECOMMENDATIONS.items()
+                if key & PLATFORM_FLAGS[platform]
+            )
+            short_term_goals.extend(GENERAL_SOCIAL_RECOMMENDATIONS)
         
         # Long-term security improvements
-        recommendations['long_term_improvements'] = [
-            "Set up regular security audits (quarterly review of accounts and passwords)",
-            "Enable security notifications on all important accounts",
-            "Consider using a VPN for enhanced privacy protection",
-            "Regularly monitor your credit reports and identity theft protection services"
+        long_term_improvements = [
+            'long_term.security_audits',
+            'long_term.security_notifications',
+            'long_term.vpn',
+            'long_term.credit_monitoring'
         ]
         
         # Educational resources based on user's tech level
-        if not behavioral.get('tech_savvy'):
-            recommendations['educational_resources'] = [
-                "Learn about phishing attacks and how to identify them",
-                "Understand the basics of two-factor authentication",
-                "Read about safe browsing practices and public Wi-Fi risks"
+        if not key & FLAG_TECH_SAVVY:
+            educational_resources = [
+                'education.basic.phishing',
+                'education.basic.two_factor',
+                'education.basic.safe_browsing'
             ]
         else:
-            recommendations['educational_resources'] = [
-                "Advanced privacy tools and techniques",
-                "Understanding data breach notifications and response",
-                "Corporate security best practices for remote work"
+            educational_resources = [
+                'education.advanced.privacy_tools',
+                'education.advanced.breach_response',
+                'education.advanced.remote_work'
             ]
         
-        # Calculate priority score
-        recommendations['priority_score'] = self._calculate_priority_score(risk_profile)
+        return (tuple(immediate_actions), tuple(short_term_goals), tuple(long_term_improvements),
+                tuple(educational_resources), AIRecommendationEngine._priority_from_key(key))
+
+    def _profile_key(self, risk_profile: Dict, social_data: List[Dict]) -> int:
+        """Rule key for an analyzed risk profile"""
+        data_sensitivity = risk_profile['data_sensitivity']
+        behavioral = risk_profile['behavioral_patterns']
+        key = URGENCY_INDEX.get(risk_profile['urgency_level'], 0) << URGENCY_SHIFT
+        for category, flag in SENSITIVITY_FLAGS.items():
+            if data_sensitivity.get(category):
+                key |= flag
+        if behavioral.get('security_conscious'):
+            key |= FLAG_SECURITY_CONSCIOUS
+        if behavioral.get('password_reuse_likely'):
+            key |= FLAG_PASSWORD_REUSE
+        if behavioral.get('tech_savvy'):
+            key |= FLAG_TECH_SAVVY
+        if risk_profile['social_exposure'] > 50:
+            key |= FLAG_SOCIAL_HIGH | self._platform_mask(social_data)
+        return key & ~FLAG_CONTACT_INFORMATION
+
+    def _platform_mask(self, social_data: List[Dict]) -> int:
+        """Key bits of the platforms with specific privacy recommendations"""
+        if isinstance(social_data, ExposureTable):
+            return int(np.bitwise_or.reduce(social_data.platform_flags(self._platform_flags)))
+        mask = 0
+        platform_flags = self._platform_flags
+        platform_spellings = self._platform_spellings
+        for exposure in social_data:
+            platform = exposure.get('platform')
+            flag = platform_spellings.get(platform)
+            mask |= flag if flag is not None else platform_flags.get(resolve(platform), 0)
+        return mask
+
+    def _expand_recommendations(self, entry: Tuple) -> Dict[str, Any]:
+        """
+        Recommendation dict from a compiled table entry: fresh, caller-owned text lists,
+        or the shared, immutable ID tuples when the engine hands out catalog IDs
+        """
+        immediate_actions, short_term_goals, long_term_improvements, educational_resources, priority_score = entry
+        if not self.expand_recommendations:
+            return {
+                'immediate_actions': immediate_actions,
+                'short_term_goals': short_term_goals,
+                'long_term_improvements': long_term_improvements,
+                'educational_resources': educational_resources,
+                'priority_score': priority_score
+            }
+        return {
+            'immediate_actions': list(immediate_actions),
+            'short_term_goals': list(short_term_goals),
+            'long_term_improvements': list(long_term_improvements),
+            'educational_resources': list(educational_resources),
+            'priority_score': priority_score
+        }
+
+    def generate_personalized_recommendations(self, risk_profile: Dict, 
+                                           breach_data: List[Dict], 
+                                           social_data: List[Dict]) -> Dict[str, Any]:
+        """Generate AI-powered personalized security recommendations"""
+        return self.recommendations_for_key(self._profile_key(risk_profile, social_data))
+
+    def recommendations_for_key(self, key: int) -> Dict[str, Any]:
+        """Recommendations for a rule key from compute_rule_keys"""
+        return self._expand_recommendations(self._recommendation_table[key])
+
+    def compute_rule_keys(self, breach_data_list: List[List[Dict]], social_data_list: List[List[Dict]],
+                          user_behaviors: List[Dict] = None) -> List[int]:
+        """
+        Rule key per user, the same key analyze_user_risk_profile would lead to, computed
+        without building profile dicts. Users sharing a key get identical recommendations.
+        """
+        severity_scores = {'low': 10, 'medium': 30, 'high': 60, 'critical': 90}
+        exposure_scores = {'low': 15, 'medium': 40, 'high': 75}
+        data_type_flags = self._data_type_flags
+        platform_flags = self._platform_flags
+        platform_spellings = self._platform_spellings
+        critical = URGENCY_INDEX['critical'] << URGENCY_SHIFT
+        high = URGENCY_INDEX['high'] << URGENCY_SHIFT
+        medium = URGENCY_INDEX['medium'] << URGENCY_SHIFT
+        behaviors = user_behaviors if user_behaviors is not None else repeat(None)
+        
+        keys = []
+        for breach_data, social_data, behavior in zip(breach_data_list, social_data_list, behaviors):
+            key = 0
+            breach_severity = 0
+            if breach_data:
+                max_severity = 0
+                for breach in breach_data:
+                    for data_type in breach.get('data_types', []):
+                        key |= data_type_flags.get(data_type, 0)
+                    severity = severity_scores.get(breach.get('severity', 'low'), 10)
+                    if severity > max_severity:
+                        max_severity = severity
+                # A 'critical' breach always scores >= 90, so the severity threshold covers it
+                breach_severity = min(100, int(max_severity * min(1.5, 1 + (len(breach_data) - 1) * 0.1)))
+            
+            social_exposure = 0
+            if social_data:
+                social_exposure = min(100, sum(
+                    exposure_scores.get(exposure.get('risk_level', 'low'), 15) for exposure in social_data
+                ))
+            
+            if breach_severity >= 80:
+                key |= critical
+            elif breach_severity >= 60 or social_exposure >= 70:
+                key |= high
+            elif breach_severity >= 40 or social_exposure >= 50:
+                key |= medium
+            
+            if behavior:
+                if behavior.get('has_2fa_enabled', False):
+                    key |= FLAG_SECURITY_CONSCIOUS
+                if behavior.get('multiple_breaches_same_email', False):
+                    key |= FLAG_PASSWORD_REUSE
+                if behavior.get('uses_password_manager', False):
+                    key |= FLAG_TECH_SAVVY
+            if social_exposure > 50:
+                key |= FLAG_SOCIAL_HIGH
+                for exposure in social_data:
+                    platform = exposure.get('platform')
+                    flag = platform_spellings.get(platform)
+                    key |= flag if flag is not None else platform_flags.get(resolve(platform), 0)
+            
+            keys.append(key & ~FLAG_CONTACT_INFORMATION)
         
-        return recommendations
+        return keys
+
+    def compute_rule_keys_columnar(self, breaches: BreachTable, exposures: ExposureTable,
+                                   user_ids: Any = None,
+                                   user_behaviors: Dict[str, Any] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Vectorized compute_rule_keys over a BreachTable and ExposureTable built with user_ids.
+        user_behaviors maps behavior names ('has_2fa_enabled', ...) to arrays aligned with
+        user_ids. Returns (user_ids, keys).
+        """
+        if breaches.user_id is None or exposures.user_id is None:
+            raise ValueError("Columnar rule keys need tables built with user_ids")
+        if user_ids is None:
+            user_ids = np.unique(np.concatenate([breaches.user_id, exposures.user_id]))
+        user_ids = np.asarray(user_ids)
+        n_users = len(user_ids)
+        keys = np.zeros(n_users, dtype=np.int64)
+        
+        breach_idx, breach_mask = index_users(user_ids, breaches.user_id)
+        breach_idx = breach_idx[breach_mask]
+        np.bitwise_or.at(keys, breach_idx, breaches.data_type_flags(self._data_type_flags)[breach_mask])
+        
+        severity = breaches.severity_weights({'low': 10, 'medium': 30, 'high': 60, 'critical': 90}, 10)
+        max_severity = np.zeros(n_users)
+        np.maximum.at(max_severity, breach_idx, severity[breach_mask])
+        breach_count = np.bincount(breach_idx, minlength=n_users)
+        # Same float operations as _assess_breach_severity, then int() truncation
+        breach_severity = np.minimum(100, np.trunc(
+            max_severity * np.minimum(1.5, 1 + (breach_count - 1) * 0.1)
+        ))
+        
+        exposure_idx, exposure_mask = index_users(user_ids, exposures.user_id)
+        exposure_idx = exposure_idx[exposure_mask]
+        social_exposure = np.minimum(100, np.bincount(
+            exposure_idx,
+            weights=exposures.risk_level_weights({'low': 15, 'medium': 40, 'high': 75}, 15)[exposure_mask],
+            minlength=n_users
+        ))
+        
+        urgency = np.select(
+            [breach_severity >= 80,
+             (breach_severity >= 60) | (social_exposure >= 70),
+             (breach_severity >= 40) | (social_exposure >= 50)],
+            [URGENCY_INDEX['critical'], URGENCY_INDEX['high'], URGENCY_INDEX['medium']],
+            URGENCY_INDEX['low']
+        )
+        keys |= urgency << URGENCY_SHIFT
+        
+        for behavior, flag in [('has_2fa_enabled', FLAG_SECURITY_CONSCIOUS),
+                               ('multiple_breaches_same_email', FLAG_PASSWORD_REUSE),
+                               ('uses_password_manager', FLAG_TECH_SAVVY)]:
+            if user_behaviors and behavior in user_behaviors:
+                keys |= np.where(np.asarray(user_behaviors[behavior], dtype=bool), flag, 0)
+        
+        social_high = social_exposure > 50
+        platform_mask = np.zeros(n_users, dtype=np.int64)
+        np.bitwise_or.at(platform_mask, exposure_idx, exposures.platform_flags(self._platform_flags)[exposure_mask])
+        keys |= np.where(social_high, FLAG_SOCIAL_HIGH | platform_mask, 0)
+        
+        return user_ids, keys & ~FLAG_CONTACT_INFORMATION
+
+    def generate_personalized_recommendations_batch(self, breach_data_list: List[List[Dict]],
+                                                    social_data_list: List[List[Dict]],
+                                                    user_behaviors: List[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        Recommendations for many users at once, identical to running analyze_user_risk_profile
+        and generate_personalized_recommendations per user
+        """
+        table = self._recommendation_table
+        expand = self._expand_recommendations
+        return [expand(table[key]) for key in self.compute_rule_keys(breach_data_list, social_data_list, user_behaviors)]
 
     def _generate_social_media_recommendations(self, social_data: List[Dict]) -> List[str]:
         """Generate specific social media privacy recommendations"""
-        recommendations = []
-        platforms = set(exposure.get('platform', '').lower() for exposure in social_data)
-        
-        platform_specific = {
-            'facebook': "Review Facebook privacy settings: limit post visibility, disable facial recognition, check app permissions",
-            'instagram': "Make Instagram account private, disable location services, review story settings",
-            'twitter': "Protect your Twitter account, review who can find you by email/phone, limit photo tagging",
-            'linkedin': "Adjust LinkedIn visibility settings, limit profile information to connections only",
-            'tiktok': "Set TikTok account to private, disable location sharing, review data download settings"
-        }
-        
-        for platform in platforms:
-            if platform in platform_specific:
-                recommendations.append(platform_specific[platform])
+        mask = self._platform_mask(social_data)
+        recommendations = [
+            recommendation for platform, recommendation in PLATFORM_RECOMMENDATIONS.items()
+            if mask & self._platform_flags[platform]
+        ]
         
         # General social media recommendations
-        recommendations.extend([
-            "Audit and remove third-party apps connected to your social accounts",
-            "Review and delete old posts containing personal information",
-            "Turn off location sharing across all social media platforms"
-        ])
+        recommendations.extend(GENERAL_SOCIAL_RECOMMENDATIONS)
         
-        return recommendations
+        return self._render(recommendations)
+
+    def _render(self, references: List[str]) -> Any:
+        """Text for catalog IDs, or the IDs themselves when the engine hands out IDs"""
+        return expand(references) if self.expand_recommendations else tuple(references)
 
     def _calculate_priority_score(self, risk_profile: Dict) -> int:
         """Calculate priority score for recommendations (0-100)"""
+        return self._priority_from_key(self._profile_key(risk_profile, []))
+
+    @staticmethod
+    def _priority_from_key(key: int) -> int:
+        """Priority score (0-100) encoded by a rule key"""
         score = 0
         
         # Base score from urgency
         urgency_scores = {'low': 20, 'medium': 50, 'high': 75, 'critical': 95}
-        score += urgency_scores.get(risk_profile['urgency_level'], 20)
+        score += urgency_scores[URGENCY_LEVELS[(key >> URGENCY_SHIFT) & 3]]
         
         # Adjust based on data sensitivity
-        if risk_profile['data_sensitivity'].get('financial_data'):
+        if key & FLAG_FINANCIAL:
             score += 20
-        if risk_profile['data_sensitivity'].get('personal_identifiers'):
+        if key & FLAG_PERSONAL_IDENTIFIERS:
             score += 15
         
         # Adjust based on user behavior
-        if not risk_profile['behavioral_patterns'].get('security_conscious'):
+        if not key & FLAG_SECURITY_CONSCIOUS:
             score += 10
         
         return min(100, score)
@@ -286,23 +556,49 @@ class AIRecommendationEngine:
         
         if urgency in ['critical', 'high']:
             content['articles'] = [
-                "What to Do When Your Data Has Been Breached: A Step-by-Step Guide",
-                "Understanding Credit Monitoring and Identity Theft Protection",
-                "How to Secure Your Accounts After a Data Breach"
+                'article.breach_guide',
+                'article.credit_monitoring',
+                'article.secure_accounts'
             ]
             content['quick_tips'] = [
-                "Change passwords starting with your most important accounts",
-                "Enable 2FA wherever possible - it blocks 99.9% of automated attacks",
-                "Monitor your accounts daily for the next 30 days"
+                'tip.change_passwords',
+                'tip.enable_2fa',
+                'tip.monitor_daily'
             ]
         
         content['tools'] = [
-            "HaveIBeenPwned - Check for future breaches",
-            "Password Manager Comparison Guide",
-            "Two-Factor Authentication Setup Guides"
+            'tool.haveibeenpwned',
+            'tool.password_managers',
+            'tool.two_factor_setup'
         ]
         
-        return content
+        return {field: self._render(references) for field, references in content.items()}
+
+@lru_cache(maxsize=None)
+def compiled_rule_table(expand_recommendations: bool = True) -> Tuple:
+    """
+    The recommendation rules evaluated once for every possible rule key. A key packs
+    urgency, the sensitivity/behavior flags and the mask of mentioned platforms; each
+    entry holds the finished recommendation lists, already expanded to text unless the
+    engine hands out catalog IDs. The rules only read module-level data, so the table is
+    built once per process and setting, not per engine.
+    """
+    table: List[Any] = [None] * (1 << (PLATFORM_SHIFT + len(PLATFORM_RECOMMENDATIONS)))
+    for key in range(len(table)):
+        # Contact information never changes a recommendation, and platforms only matter for high social exposure
+        if key & FLAG_CONTACT_INFORMATION or (key >> PLATFORM_SHIFT and not key & FLAG_SOCIAL_HIGH):
+            continue
+        if (key >> URGENCY_SHIFT) & 3 < len(URGENCY_LEVELS):
+            entry = AIRecommendationEngine._evaluate_rules(key)
+            if expand_recommendations:
+                entry = tuple(tuple(expand(references)) for references in entry[:-1]) + entry[-1:]
+            table[key] = entry
+    return tuple(table)
+
+@lru_cache(maxsize=None)
+def rule_table_version() -> str:
+    """Content hash of the compiled rules as catalog IDs; changes whenever any rule output does"""
+    return hashlib.sha256(repr(compiled_rule_table(False)).encode()).hexdigest()[:12]
 
 # Example usage and testing
 if __name__ == "__main__":
@@ -331,3 +627,7 @@ if __name__ == "__main__":
     recommendations = engine.generate_personalized_recommendations(risk_profile, sample_breaches, sample_social)
     
     print(json.dumps(recommendations, indent=2, default=str))
+    
+    # Compact payload: catalog IDs only, expanded by the client from recommendation_catalog
+    id_engine = AIRecommendationEngine(expand_recommendations=False)
+    print(json.dumps(id_engine.generate_personalized_recommendations(risk_profile, sample_breaches, sample_social)))
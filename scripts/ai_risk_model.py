@@ -3,48 +3,132 @@ AI Risk Assessment Model for Digital Footprint Analysis
 Trained model for analyzing user risk based on email/phone exposure
 """
 
+import asyncio
+import copy
 import numpy as np
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
-import joblib
 import requests
 import json
+import weakref
 from datetime import datetime
 import hashlib
 
+from compiled_forest import CompiledScaler, compile_forest
+from model_registry import ModelRegistry
+from platform_probe import NO_ACCOUNT, RISK_LEVELS, PlatformProbe
+from platforms import PLATFORM_IDS, display_name
+from records import ExposureTable
+
 class DigitalRiskAnalyzer:
-    def __init__(self):
+    def __init__(self, registry=None, model_name="risk_model", model_version=None, breach_index=None,
+                 probe_cache=None, source_timeouts=None, max_concurrent_sources=32):
         self.risk_model = None
-        self.scaler = StandardScaler()
+        self.scaler = None
+        self.registry = registry or ModelRegistry()
+        self.model_name = model_name
+        self.model_version = model_version
+        self.model_metadata = None
+        self.breach_index = breach_index
         self.breach_databases = [
             "haveibeenpwned",
             "dehashed", 
             "leakcheck",
             "intelx"
         ]
-        self.social_platforms = [
-            "facebook", "linkedin", "twitter", "instagram", 
-            "tiktok", "snapchat", "reddit", "pinterest"
-        ]
+        self.social_platforms = list(PLATFORM_IDS)
+        self.platform_probe = PlatformProbe(self.social_platforms, cache=probe_cache)
         
-    def train_model(self):
+        # Async fan-out: per-source deadlines (seconds) and a cap on in-flight source calls
+        self.source_timeouts = {"breaches": 2.0, "social_exposures": 2.0, "dark_web_mentions": 3.0}
+        self.source_timeouts.update(source_timeouts or {})
+        self.max_concurrent_sources = max_concurrent_sources
+        # One semaphore per event loop: an asyncio.Semaphore binds to the loop that first waits on it
+        self._source_semaphores = weakref.WeakKeyDictionary()
+        
+    def train_model(self, n_samples=10000, model_type="forest", n_jobs=-1, random_state=42):
         """Train the risk assessment model with synthetic data"""
+        # scikit-learn is only needed for training; serving can use the compiled model
+        from sklearn.preprocessing import StandardScaler
+        
         # Generate synthetic training data
-        n_samples = 10000
+        rng = np.random.default_rng(random_state)
+        X, risk_score = self.generate_training_data(n_samples, rng)
+        
+        # Train the model
+        self.scaler = StandardScaler()
+        self.scaler.fit(X)
+        X_scaled = self.scaler.transform(X)
+        
+        self.risk_model = self._build_estimator(model_type, n_jobs, random_state)
+        self.risk_model.fit(X_scaled, risk_score)
+        
+        # Save model and scaler together as a new registry version
+        self.model_metadata = self.registry.save(
+            self.model_name, self.risk_model, self.scaler,
+            metadata={"n_samples": n_samples, "model_type": model_type, "random_state": random_state}
+        )
         
+        print(f"Risk assessment model trained and saved as version {self.model_metadata['version']}!")
+    
+    def train_model_streaming(self, n_samples=100_000_000, chunk_size=100_000, model_type="mlp", seed=42):
+        """Train out-of-core on a seeded synthetic stream, holding one chunk in memory at a time"""
+        from sklearn.preprocessing import StandardScaler
+        
+        # Pass 1: scaler statistics. The stream is regenerated from the seed rather than stored.
+        self.scaler = StandardScaler()
+        for X, _ in self.iter_training_data(n_samples, chunk_size, seed):
+            self.scaler.partial_fit(X)
+        
+        # Pass 2: incremental fit on the same rows
+        self.risk_model = self._build_incremental_estimator(model_type, seed)
+        for X, risk_score in self.iter_training_data(n_samples, chunk_size, seed):
+            self.risk_model.partial_fit(self.scaler.transform(X), risk_score)
+        
+        self.model_metadata = self.registry.save(
+            self.model_name, self.risk_model, self.scaler,
+            metadata={"n_samples": n_samples, "model_type": model_type, "seed": seed, "chunk_size": chunk_size}
+        )
+        
+        print(f"Risk assessment model trained on {n_samples} streamed rows and saved as version "
+              f"{self.model_metadata['version']}!")
+    
+    @staticmethod
+    def _build_incremental_estimator(model_type, random_state=42):
+        """Create an unfitted regressor that supports partial_fit"""
+        if model_type == "mlp":
+            from sklearn.neural_network import MLPRegressor
+            return MLPRegressor(hidden_layer_sizes=(64, 32), learning_rate_init=1e-3, random_state=random_state)
+        if model_type == "sgd":
+            from sklearn.linear_model import SGDRegressor
+            return SGDRegressor(random_state=random_state)
+        raise ValueError(f"Unknown incremental model_type '{model_type}'; use 'mlp' or 'sgd'")
+    
+    @staticmethod
+    def _build_estimator(model_type, n_jobs=-1, random_state=42):
+        """Create an unfitted regressor for the continuous risk_score target"""
+        if model_type == "forest":
+            from sklearn.ensemble import RandomForestRegressor
+            # Leaf size bounds tree depth (and model size) as n_samples grows
+            return RandomForestRegressor(
+                n_estimators=100, min_samples_leaf=5, n_jobs=n_jobs, random_state=random_state
+            )
+        if model_type == "hist_gradient_boosting":
+            from sklearn.ensemble import HistGradientBoostingRegressor
+            # Parallelized across cores by OpenMP, independent of n_jobs
+            return HistGradientBoostingRegressor(max_iter=200, random_state=random_state)
+        raise ValueError(f"Unknown model_type '{model_type}'; use 'forest' or 'hist_gradient_boosting'")
+    
+    @classmethod
+    def generate_training_data(cls, n_samples, rng):
+        """Draw synthetic feature rows and their noisy risk_score targets"""
         # Features: breach_count, social_exposure, account_age, password_strength, 2fa_enabled
-        X = np.random.rand(n_samples, 8)
-        
-        # Feature engineering
-        breach_count = np.random.poisson(2, n_samples)  # Average 2 breaches per user
-        social_exposure = np.random.beta(2, 5, n_samples) * 100  # Skewed towards lower exposure
-        account_age_years = np.random.exponential(5, n_samples)  # Average 5 years
-        password_strength = np.random.choice([0, 1, 2, 3], n_samples, p=[0.3, 0.4, 0.2, 0.1])
-        two_fa_enabled = np.random.choice([0, 1], n_samples, p=[0.7, 0.3])
-        dark_web_mentions = np.random.poisson(1, n_samples)
-        public_records = np.random.beta(1, 3, n_samples) * 50
-        recent_activity = np.random.exponential(30, n_samples)  # Days since last activity
+        breach_count = rng.poisson(2, n_samples)  # Average 2 breaches per user
+        social_exposure = rng.beta(2, 5, n_samples) * 100  # Skewed towards lower exposure
+        account_age_years = rng.exponential(5, n_samples)  # Average 5 years
+        password_strength = rng.choice([0, 1, 2, 3], n_samples, p=[0.3, 0.4, 0.2, 0.1])
+        two_fa_enabled = rng.choice([0, 1], n_samples, p=[0.7, 0.3])
+        dark_web_mentions = rng.poisson(1, n_samples)
+        public_records = rng.beta(1, 3, n_samples) * 50
+        recent_activity = rng.exponential(30, n_samples)  # Days since last activity
         
         X = np.column_stack([
             breach_count, social_exposure, account_age_years, 
@@ -52,8 +136,25 @@ class DigitalRiskAnalyzer:
             public_records, recent_activity
         ])
         
-        # Calculate risk score (0-100)
-        risk_score = (
+        # Normalize to 0-100 and add noise
+        risk_score = np.clip(cls.synthetic_risk_formula(X) + rng.normal(0, 5, n_samples), 0, 100)
+        return X, risk_score
+    
+    @classmethod
+    def iter_training_data(cls, n_samples, chunk_size=100_000, seed=42):
+        """Yield (X, risk_score) chunks; the same seed and chunk_size always reproduce the same rows"""
+        for chunk_index, start in enumerate(range(0, n_samples, chunk_size)):
+            # Each chunk has its own generator, so any chunk can be reproduced on its own
+            rng = np.random.default_rng([seed, chunk_index])
+            yield cls.generate_training_data(min(chunk_size, n_samples - start), rng)
+    
+    @staticmethod
+    def synthetic_risk_formula(X):
+        """Noise-free risk score (before clipping) the synthetic targets are drawn around"""
+        (breach_count, social_exposure, account_age_years, password_strength,
+         two_fa_enabled, dark_web_mentions, public_records, recent_activity) = X.T
+        
+        return (
             breach_count * 15 +  # Each breach adds 15 points
             social_exposure * 0.3 +  # Social exposure weight
             np.maximum(0, 10 - account_age_years) * 2 +  # Newer accounts riskier
@@ -64,35 +165,35 @@ class DigitalRiskAnalyzer:
             np.maximum(0, 90 - recent_activity) * 0.1  # Recent activity reduces risk
         )
         
-        # Normalize to 0-100 and add noise
-        risk_score = np.clip(risk_score + np.random.normal(0, 5, n_samples), 0, 100)
-        
-        # Train the model
-        self.scaler.fit(X)
-        X_scaled = self.scaler.transform(X)
-        
-        self.risk_model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.risk_model.fit(X_scaled, risk_score)
-        
-        # Save the model
-        joblib.dump(self.risk_model, 'risk_model.pkl')
-        joblib.dump(self.scaler, 'risk_scaler.pkl')
-        
-        print("Risk assessment model trained and saved successfully!")
-        
     def load_model(self):
-        """Load the trained model"""
-        try:
-            self.risk_model = joblib.load('risk_model.pkl')
-            self.scaler = joblib.load('risk_scaler.pkl')
-            return True
-        except:
-            print("Model not found, training new model...")
-            self.train_model()
-            return True
+        """Load the trained model from the registry (never trains on a miss)"""
+        self.risk_model, self.scaler, self.model_metadata = self.registry.load(
+            self.model_name, self.model_version
+        )
+        return True
+    
+    def export_compiled_model(self):
+        """
+        Save a NumPy-only copy of the forest and scaler as '<model_name>_compiled'.
+        Only model_type="forest" can be compiled; other models (e.g. hist_gradient_boosting)
+        are served from their scikit-learn registry artifact, and raise ValueError here.
+        """
+        if not self.risk_model:
+            self.load_model()
+        
+        return self.registry.save(
+            f"{self.model_name}_compiled",
+            compile_forest(self.risk_model),
+            CompiledScaler.from_sklearn(self.scaler),
+            metadata={"source_version": self.model_metadata["version"]}
+        )
     
     def check_email_breaches(self, email):
         """Check if email appears in known breaches"""
+        if self.breach_index is not None:
+            # Local memory-mapped index lookup, no network round trip
+            return self.breach_index.lookup(email)
+        
         # Simulate breach checking (in production, use real APIs)
         email_hash = hashlib.sha1(email.encode()).hexdigest()
         
@@ -120,22 +221,30 @@ class DigitalRiskAnalyzer:
     
     def analyze_social_exposure(self, email, phone=None):
         """Analyze social media exposure"""
+        return self.analyze_social_exposures([email])[0]
+    
+    def analyze_social_exposures(self, emails):
+        """Analyze social media exposure for many emails in one probe pass"""
         # Simulate social media analysis
-        username = email.split('@')[0]
-        
-        exposures = []
-        for platform in self.social_platforms:
-            # Simulate finding accounts
-            if hash(username + platform) % 3 == 0:  # 33% chance of having account
-                risk_level = ["Low", "Medium", "High"][hash(username + platform) % 3]
-                exposures.append({
-                    "platform": platform.title(),
-                    "username": username,
-                    "risk_level": risk_level,
-                    "issues": self._generate_social_issues(risk_level)
-                })
-        
-        return exposures
+        usernames = [email.split('@')[0] for email in emails]
+        codes = self.platform_probe.probe(usernames)
+        
+        all_exposures = []
+        for username, platform_codes in zip(usernames, codes):
+            exposures = []
+            for platform, code in zip(self.social_platforms, platform_codes):
+                # Simulate finding accounts (33% chance of having one)
+                if code != NO_ACCOUNT:
+                    risk_level = RISK_LEVELS[code]
+                    exposures.append({
+                        "platform": display_name(platform),
+                        "username": username,
+                        "risk_level": risk_level,
+                        "issues": self._generate_social_issues(risk_level)
+                    })
+            all_exposures.append(exposures)
+        
+        return all_exposures
     
     def _generate_social_issues(self, risk_level):
         """Generate social media privacy issues"""
@@ -169,16 +278,154 @@ class DigitalRiskAnalyzer:
             self.load_model()
         
         # Gather all risk factors
-        breaches = self.check_email_breaches(email)
-        social_exposures = self.analyze_social_exposure(email, phone)
-        dark_web_mentions = self.check_dark_web_mentions(email)
+        sources = self.gather_sources(email, phone)
+        features = np.array([self.extract_features(*sources)])
+        
+        # Scale features and predict
+        features_scaled = self.scaler.transform(features)
+        risk_score = self.risk_model.predict(features_scaled)[0]
+        
+        return self.build_report(risk_score, *sources)
+    
+    def score_findings(self, breaches, social_exposures, dark_web_mentions=()):
+        """
+        Score findings that were already collected: lists of dicts or records.BreachRecord/
+        ExposureRecord, or a BreachTable/ExposureTable for long histories
+        """
+        if not self.risk_model:
+            self.load_model()
+        
+        features = np.array([self.extract_features(breaches, social_exposures, dark_web_mentions)])
+        risk_score = self.risk_model.predict(self.scaler.transform(features))[0]
+        return self.build_report(risk_score, breaches, social_exposures, dark_web_mentions)
+    
+    async def calculate_risk_score_async(self, email, phone=None, additional_data=None):
+        """
+        Calculate comprehensive risk score with all sources queried concurrently.
+        A source that fails or exceeds its timeout contributes no findings and is
+        listed under "degraded_sources" instead of failing the whole scan.
+        """
+        if not self.risk_model:
+            await asyncio.to_thread(self.load_model)
+        
+        results = await asyncio.gather(
+            self._query_source("breaches", self.check_email_breaches, email),
+            self._query_source("social_exposures", self.analyze_social_exposure, email, phone),
+            self._query_source("dark_web_mentions", self.check_dark_web_mentions, email)
+        )
+        sources = tuple(findings for _, findings, _ in results)
+        degraded_sources = {name: error for name, _, error in results if error}
+        
+        features = np.array([self.extract_features(*sources)])
+        risk_score = self.risk_model.predict(self.scaler.transform(features))[0]
+        
+        report = self.build_report(risk_score, *sources)
+        report["degraded_sources"] = degraded_sources
+        return report
+    
+    def _source_semaphore(self):
+        """The running loop's semaphore bounding in-flight source calls"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._source_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._source_semaphores[loop] = asyncio.Semaphore(self.max_concurrent_sources)
+        return semaphore
+    
+    async def _query_source(self, name, source, *args):
+        """
+        Run one source under the loop's semaphore and its timeout; returns (name, findings, error).
+        The slot is released when the call actually ends, not when its deadline passes: a timed-out
+        coroutine is cancelled, but a blocking source keeps its worker thread until it returns.
+        """
+        semaphore = self._source_semaphore()
+        await semaphore.acquire()
+        if asyncio.iscoroutinefunction(source):
+            task = asyncio.ensure_future(source(*args))
+        else:
+            task = asyncio.ensure_future(asyncio.to_thread(source, *args))
+        task.add_done_callback(lambda done: self._release_source(semaphore, done))
         
-        # Extract features for model
+        try:
+            return name, await asyncio.wait_for(asyncio.shield(task), self.source_timeouts.get(name)), None
+        except (asyncio.TimeoutError, asyncio.CancelledError) as error:
+            # A worker thread cannot be interrupted, so only coroutine sources are cancelled
+            if asyncio.iscoroutinefunction(source):
+                task.cancel()
+            if isinstance(error, asyncio.CancelledError):
+                raise
+            return name, [], "timeout"
+        except Exception as error:
+            return name, [], f"{type(error).__name__}: {error}"
+    
+    @staticmethod
+    def _release_source(semaphore, task):
+        semaphore.release()
+        # Retrieve a late failure of a timed-out source so asyncio does not log it as unhandled
+        if not task.cancelled():
+            task.exception()
+    
+    def calculate_risk_scores(self, emails, phones=None, chunk_size=1024, n_jobs=None):
+        """Calculate risk reports for many users with one scale and predict call per chunk"""
+        if not self.risk_model:
+            self.load_model()
+        
+        phones = phones if phones is not None else [None] * len(emails)
+        if len(phones) != len(emails):
+            raise ValueError("phones must be the same length as emails")
+        
+        reports = []
+        for start in range(0, len(emails), chunk_size):
+            chunk_emails = emails[start:start + chunk_size]
+            # Probe every platform for the whole chunk at once
+            chunk_social = self.analyze_social_exposures(chunk_emails)
+            chunk_sources = [
+                (self.check_email_breaches(email), social_exposures, self.check_dark_web_mentions(email))
+                for email, social_exposures in zip(chunk_emails, chunk_social)
+            ]
+            features = np.array([self.extract_features(*sources) for sources in chunk_sources])
+            
+            risk_scores = self._predict(self.scaler.transform(features), n_jobs)
+            reports.extend(
+                self.build_report(risk_score, *sources)
+                for risk_score, sources in zip(risk_scores, chunk_sources)
+            )
+        
+        return reports
+    
+    def _predict(self, X, n_jobs=None):
+        """risk_model.predict, spreading a forest's trees over n_jobs workers when given"""
+        if n_jobs is None or not hasattr(self.risk_model, "n_jobs"):
+            return self.risk_model.predict(X)
+        
+        # The model is shared with other threads (server workers, the coalescer), so its
+        # n_jobs is never changed. An estimator's own n_jobs takes precedence over
+        # joblib.parallel_config, so predict through a shallow copy that defers to it;
+        # the copy shares the fitted trees.
+        from joblib import parallel_config
+        model = copy.copy(self.risk_model)
+        model.n_jobs = None
+        with parallel_config(n_jobs=n_jobs):
+            return model.predict(X)
+    
+    def gather_sources(self, email, phone=None):
+        """Query breach, social and dark web sources for one user"""
+        return (
+            self.check_email_breaches(email),
+            self.analyze_social_exposure(email, phone),
+            self.check_dark_web_mentions(email)
+        )
+    
+    def extract_features(self, breaches, social_exposures, dark_web_mentions):
+        """Build the model feature row for one user"""
         breach_count = len(breaches)
-        social_exposure_score = sum([
-            {"Low": 10, "Medium": 30, "High": 50}.get(exp["risk_level"], 0) 
-            for exp in social_exposures
-        ])
+        risk_level_scores = {"Low": 10, "Medium": 30, "High": 50}
+        if isinstance(social_exposures, ExposureTable):
+            social_exposure_score = int(social_exposures.risk_level_weights(risk_level_scores, 0).sum())
+        else:
+            social_exposure_score = sum([
+                risk_level_scores.get(exp["risk_level"], 0) 
+                for exp in social_exposures
+            ])
         
         # Simulate other features
         account_age = 5.0  # Default 5 years
@@ -188,15 +435,14 @@ class DigitalRiskAnalyzer:
         public_records = 25.0  # Default moderate exposure
         recent_activity = 30.0  # Default 30 days
         
-        features = np.array([[
+        return [
             breach_count, social_exposure_score, account_age,
             password_strength, two_fa_enabled, dark_web_count,
             public_records, recent_activity
-        ]])
-        
-        # Scale features and predict
-        features_scaled = self.scaler.transform(features)
-        risk_score = self.risk_model.predict(features_scaled)[0]
+        ]
+    
+    def build_report(self, risk_score, breaches, social_exposures, dark_web_mentions):
+        """Assemble the per-user report from a model prediction"""
         risk_score = max(0, min(100, risk_score))  # Ensure 0-100 range
         
         # Generate recommendations
@@ -241,7 +487,7 @@ class DigitalRiskAnalyzer:
                     "name": exposure["platform"],
                     "type": "Social Media",
                     "risk": exposure["risk_level"],
-                    "data_exposed": exposure["issues"]
+                    "data_exposed": exposure.get("issues", [])
                 })
         
         return sites
@@ -294,9 +540,34 @@ class DigitalRiskAnalyzer:
 
 # Initialize and train the model
 if __name__ == "__main__":
+    import time
+    
     analyzer = DigitalRiskAnalyzer()
     analyzer.train_model()
+    analyzer.export_compiled_model()
     
     # Test the model
     test_result = analyzer.calculate_risk_score("test@example.com", "+1234567890")
     print(json.dumps(test_result, indent=2))
+    
+    # Async fan-out against stub sources with injected latency: wall time tracks the
+    # slowest source, and the dark web stub overruns its timeout and is degraded
+    class StubLatencyAnalyzer(DigitalRiskAnalyzer):
+        async def check_email_breaches(self, email):
+            await asyncio.sleep(0.3)
+            return super().check_email_breaches(email)
+        
+        async def analyze_social_exposure(self, email, phone=None):
+            await asyncio.sleep(0.5)
+            return super().analyze_social_exposure(email, phone)
+        
+        async def check_dark_web_mentions(self, email):
+            await asyncio.sleep(5.0)
+            return super().check_dark_web_mentions(email)
+    
+    stub_analyzer = StubLatencyAnalyzer(source_timeouts={"dark_web_mentions": 0.8})
+    stub_analyzer.load_model()
+    start = time.perf_counter()
+    stub_result = asyncio.run(stub_analyzer.calculate_risk_score_async("test@example.com"))
+    print(f"Async scan took {time.perf_counter() - start:.2f}s "
+          f"(sources: 0.3s + 0.5s + 0.8s timeout); degraded: {stub_result['degraded_sources']}")
@@ -0,0 +1,97 @@
+"""
+Risk Score Coalescer Benchmark
+Throughput and per-request latency of single-user risk scoring under concurrent
+callers, unbatched versus micro-batched through RiskScoreCoalescer
+"""
+
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+from ai_risk_model import DigitalRiskAnalyzer
+from risk_coalescer import RiskScoreCoalescer
+
+CONCURRENCY = [1, 4, 16, 64, 256]
+WAIT_MS = [0.5, 2.0, 5.0]
+
+
+def run_clients(score, n_clients, requests_per_client):
+    """Run n_clients threads that each score requests_per_client emails back to back"""
+    latencies = [[] for _ in range(n_clients)]
+    barrier = threading.Barrier(n_clients + 1)
+
+    def client(index):
+        emails = [f"user{index}-{i}@example.com" for i in range(requests_per_client)]
+        barrier.wait()
+        for email in emails:
+            start = time.perf_counter()
+            score(email)
+            latencies[index].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(n_clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    all_latencies = np.concatenate([np.array(client_latencies) for client_latencies in latencies]) * 1000
+    return {
+        "throughput": round(len(all_latencies) / elapsed, 1),
+        "p50_ms": round(float(np.percentile(all_latencies, 50)), 2),
+        "p99_ms": round(float(np.percentile(all_latencies, 99)), 2)
+    }
+
+
+def run_benchmark(analyzer, concurrency=CONCURRENCY, wait_ms=WAIT_MS, max_batch_size=256, total_requests=2000):
+    """One row per (path, client count); the unbatched path calls the analyzer directly"""
+    results = []
+    for n_clients in concurrency:
+        requests_per_client = max(1, total_requests // n_clients)
+        results.append({
+            "path": "unbatched", "clients": n_clients,
+            **run_clients(analyzer.calculate_risk_score, n_clients, requests_per_client)
+        })
+        for wait in wait_ms:
+            with RiskScoreCoalescer(analyzer, max_batch_size=max_batch_size, max_wait_ms=wait) as coalescer:
+                metrics = run_clients(coalescer.calculate_risk_score, n_clients, requests_per_client)
+            results.append({
+                "path": f"coalesced {wait}ms", "clients": n_clients, **metrics,
+                "mean_batch": round(coalescer.stats['requests'] / max(1, coalescer.stats['batches']), 1)
+            })
+    return results
+
+
+def print_report(results):
+    """Print results as a plain-text table"""
+    header = f"{'path':<18} {'clients':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'batch':>7}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result['path']:<18} {result['clients']:>8} {result['throughput']:>10} "
+              f"{result['p50_ms']:>9} {result['p99_ms']:>9} {result.get('mean_batch', 1):>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark micro-batched risk scoring")
+    parser.add_argument("--model-name", default="risk_model", help="Registry model for DigitalRiskAnalyzer")
+    parser.add_argument("--clients", nargs="+", type=int, default=CONCURRENCY, help="Concurrent callers")
+    parser.add_argument("--wait-ms", nargs="+", type=float, default=WAIT_MS, help="Coalescer windows to try")
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per run, split across clients")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    analyzer = DigitalRiskAnalyzer(model_name=args.model_name)
+    analyzer.load_model()
+    results = run_benchmark(analyzer, args.clients, args.wait_ms, args.max_batch_size, args.requests)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,170 @@
+"""
+Label Alignment Benchmark
+Checks a NumPy whole-batch label aligner against enhanced_pii_trainer.align_labels on
+randomized batches, then times both next to the tokenization they follow
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from itertools import chain
+
+import numpy as np
+
+from benchmark_suite import generate_ner_corpus
+from enhanced_pii_trainer import B_TO_I, PII_LABELS, align_labels
+
+B_TO_I_ARRAY = np.array(B_TO_I)
+
+
+def _content_word_ids(word_ids, lengths):
+    """
+    (positions, word indices) of the non-special tokens of the flattened batch. Special
+    tokens normally form the same prefix and suffix in every example, so only the content
+    between them is converted, as plain ints; otherwise every token goes through a
+    None -> NaN conversion.
+    """
+    leading = trailing = None
+    for ids in word_ids:
+        positions = [position for position, word in enumerate(ids) if word is not None]
+        if positions:
+            leading, trailing = positions[0], len(ids) - 1 - positions[-1]
+            break
+    if leading is not None and all(
+        ids[:leading] == [None] * leading and ids[len(ids) - trailing:] == [None] * trailing for ids in word_ids
+    ):
+        content_lengths = np.maximum(lengths - leading - trailing, 0)
+        try:
+            words = np.fromiter(
+                chain.from_iterable([ids[leading:len(ids) - trailing] for ids in word_ids]),
+                dtype=np.int64, count=int(content_lengths.sum())
+            )
+        except TypeError:
+            # A special token inside the content, e.g. a sentence pair separator
+            pass
+        else:
+            shift = np.cumsum(lengths) - lengths + leading - (np.cumsum(content_lengths) - content_lengths)
+            return np.arange(len(words)) + np.repeat(shift, content_lengths), words
+
+    flat = np.array(list(chain.from_iterable(word_ids)), dtype=np.float64)
+    positions = np.flatnonzero(~np.isnan(flat))
+    return positions, flat[positions].astype(np.int64)
+
+
+def align_labels_vectorized(word_ids, ner_tags, label_all_tokens=False):
+    """align_labels as flat array operations over the whole batch"""
+    lengths = np.fromiter(map(len, word_ids), dtype=np.int64, count=len(word_ids))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    positions, words = _content_word_ids(word_ids, lengths)
+    example = np.searchsorted(ends, positions, side='right')
+
+    # A first subword follows a special token, another word or the start of an example
+    first = np.ones(len(words), dtype=bool)
+    first[1:] = (words[1:] != words[:-1]) | (positions[1:] != positions[:-1] + 1)
+
+    tag_lengths = np.fromiter(map(len, ner_tags), dtype=np.int64, count=len(ner_tags))
+    tags = np.fromiter(chain.from_iterable(ner_tags), dtype=np.int64, count=int(tag_lengths.sum()))
+    if (words >= tag_lengths[example]).any():
+        raise IndexError("word_ids refer to a word with no ner_tags entry")
+    word_tags = tags[np.cumsum(tag_lengths)[example] - tag_lengths[example] + words]
+
+    labels = np.full(int(ends[-1]) if len(ends) else 0, -100, dtype=np.int64)
+    if label_all_tokens:
+        labels[positions] = np.where(first, word_tags, B_TO_I_ARRAY[word_tags])
+    else:
+        labels[positions[first]] = word_tags[first]
+    flat = labels.tolist()
+    return [flat[start:end] for start, end in zip(starts.tolist(), ends.tolist())]
+
+
+def random_batch(tokenizer, rng, max_batch=64):
+    """A batch with random sizes, tags and truncation, plus the edge cases a corpus can hold"""
+    corpus = generate_ner_corpus(int(rng.integers(1, max_batch)), seed=int(rng.integers(1 << 31)))
+    tokens = corpus['tokens']
+    tokens.extend([[], ["x" * int(rng.integers(1, 40))], ["", "a", ""]][:int(rng.integers(0, 4))])
+    tags = [rng.integers(0, len(PII_LABELS), size=len(sentence)).tolist() for sentence in tokens]
+    max_length = int(rng.integers(4, 128)) if rng.random() < 0.5 else None
+    encoded = tokenizer(tokens, truncation=True, is_split_into_words=True, max_length=max_length)
+    return [encoded.word_ids(batch_index=i) for i in range(len(tokens))], tags
+
+
+def check_equivalence(tokenizer, n_batches, seed=0):
+    """Number of randomized batches where both aligners agreed; raises on the first mismatch"""
+    rng = np.random.default_rng(seed)
+    for trial in range(n_batches):
+        word_ids, tags = random_batch(tokenizer, rng)
+        for label_all_tokens in (False, True):
+            if align_labels_vectorized(word_ids, tags, label_all_tokens) != align_labels(word_ids, tags, label_all_tokens):
+                raise AssertionError(f"Mismatch in batch {trial} (label_all_tokens={label_all_tokens})")
+    return n_batches
+
+
+def best_time(function, batches, repeats=3):
+    """Best-of-repeats seconds to run function over every batch"""
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for batch in batches:
+            function(*batch)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(tokenizer, n_sentences, batch_size):
+    corpus = generate_ner_corpus(n_sentences)
+    text_batches = [(corpus['tokens'][start:start + batch_size],) for start in range(0, n_sentences, batch_size)]
+
+    def tokenize(tokens):
+        return tokenizer(tokens, truncation=True, is_split_into_words=True)
+
+    tokenize_s = best_time(tokenize, text_batches, repeats=1)
+    batches = []
+    for (tokens,), start in zip(text_batches, range(0, n_sentences, batch_size)):
+        encoded = tokenize(tokens)
+        batches.append((
+            [encoded.word_ids(batch_index=i) for i in range(len(tokens))],
+            corpus['ner_tags'][start:start + batch_size]
+        ))
+
+    loop_s = best_time(align_labels, batches)
+    vectorized_s = best_time(align_labels_vectorized, batches)
+    return {
+        "sentences": n_sentences,
+        "tokens": sum(len(ids) for word_ids, _ in batches for ids in word_ids),
+        "batch_size": batch_size,
+        "tokenize_s": round(tokenize_s, 3),
+        "loop_s": round(loop_s, 3),
+        "vectorized_s": round(vectorized_s, 3),
+        "speedup": round(loop_s / vectorized_s, 2)
+    }
+
+
+if __name__ == "__main__":
+    from transformers import AutoTokenizer
+
+    parser = argparse.ArgumentParser(description="Verify and benchmark whole-batch NER label alignment")
+    parser.add_argument("--tokenizer", help="Fast tokenizer name or path (default: tiny local BERT vocabulary)")
+    parser.add_argument("--sentences", type=int, default=50000)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Examples per datasets.map batch")
+    parser.add_argument("--trials", type=int, default=500, help="Randomized batches for the equivalence check")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    if args.tokenizer:
+        tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    else:
+        from pii_scan_service import build_tiny_checkpoints
+        tokenizer = AutoTokenizer.from_pretrained(build_tiny_checkpoints(tempfile.mkdtemp(prefix='align-'))['ner'])
+
+    print(f"Equivalent on {check_equivalence(tokenizer, args.trials)} randomized batches (both label modes)")
+    results = run_benchmark(tokenizer, args.sentences, args.batch_size)
+    print(f"{results['sentences']} sentences, {results['tokens']} tokens, batches of {results['batch_size']}")
+    print(f"  tokenize    {results['tokenize_s']:>8}s")
+    print(f"  align loop  {results['loop_s']:>8}s")
+    print(f"  align NumPy {results['vectorized_s']:>8}s  ({results['speedup']}x the loop)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
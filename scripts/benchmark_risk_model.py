@@ -0,0 +1,103 @@
+"""
+Risk Model Training Benchmark
+Compares the DigitalRiskAnalyzer regressors on fit time, model size,
+predict latency across batch sizes, and MAE against the synthetic formula
+"""
+
+import argparse
+import json
+import pickle
+import time
+
+import numpy as np
+
+from ai_risk_model import DigitalRiskAnalyzer
+from compiled_forest import compile_forest
+
+BATCH_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def measure_latency(predict, X, batch_sizes=BATCH_SIZES, repeats=20):
+    """Median wall time of predict() per batch size, in milliseconds"""
+    latencies = {}
+    for batch_size in batch_sizes:
+        batch = X[:batch_size]
+        predict(batch)  # warm up
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            predict(batch)
+            timings.append(time.perf_counter() - start)
+        latencies[batch_size] = round(float(np.median(timings)) * 1000, 3)
+    return latencies
+
+
+def run_benchmark(n_samples, model_types, n_jobs=-1, n_holdout=100000, random_state=42):
+    """Train each model type on the same synthetic data and collect metrics"""
+    rng = np.random.default_rng(random_state)
+    X_train, y_train = DigitalRiskAnalyzer.generate_training_data(n_samples, rng)
+    X_holdout, _ = DigitalRiskAnalyzer.generate_training_data(n_holdout, rng)
+    expected = np.clip(DigitalRiskAnalyzer.synthetic_risk_formula(X_holdout), 0, 100)
+
+    from sklearn.preprocessing import StandardScaler
+    scaler = StandardScaler().fit(X_train)
+    X_train_scaled = scaler.transform(X_train)
+    X_holdout_scaled = scaler.transform(X_holdout)
+
+    results = []
+    for model_type in model_types:
+        model = DigitalRiskAnalyzer._build_estimator(model_type, n_jobs, random_state)
+
+        start = time.perf_counter()
+        model.fit(X_train_scaled, y_train)
+        fit_seconds = time.perf_counter() - start
+
+        candidates = [(model_type, model)]
+        if model_type == "forest":
+            candidates.append(("forest (compiled)", compile_forest(model)))
+
+        for name, predictor in candidates:
+            predictions = predictor.predict(X_holdout_scaled)
+            results.append({
+                "model": name,
+                "n_samples": n_samples,
+                "fit_seconds": round(fit_seconds, 2),
+                "model_bytes": len(pickle.dumps(predictor, protocol=pickle.HIGHEST_PROTOCOL)),
+                "predict_ms": measure_latency(predictor.predict, X_holdout_scaled),
+                "mae": round(float(np.mean(np.abs(predictions - expected))), 3)
+            })
+
+    return results
+
+
+def print_report(results):
+    """Print results as a plain-text table"""
+    header = f"{'model':<24} {'fit s':>8} {'size MB':>9} {'MAE':>7} " + " ".join(
+        f"{'p@' + str(size):>9}" for size in BATCH_SIZES
+    )
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(
+            f"{result['model']:<24} {result['fit_seconds']:>8} "
+            f"{result['model_bytes'] / 1e6:>9.1f} {result['mae']:>7} " +
+            " ".join(f"{result['predict_ms'][size]:>9}" for size in BATCH_SIZES)
+        )
+    print("(p@N = median predict latency in ms for a batch of N rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark risk model training and inference")
+    parser.add_argument("--samples", type=int, default=1000000, help="Synthetic training rows")
+    parser.add_argument("--models", nargs="+", default=["forest", "hist_gradient_boosting"],
+                        choices=["forest", "hist_gradient_boosting"])
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Cores used to fit the forest")
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.samples, args.models, n_jobs=args.n_jobs)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
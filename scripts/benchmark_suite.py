@@ -0,0 +1,323 @@
+"""
+Engine Benchmark Suite
+Throughput, p50/p99 latency and peak memory for the public entry points of
+RiskAssessmentEngine, AIRecommendationEngine, DigitalRiskAnalyzer and the PII
+tokenization step, with regression checks against a saved baseline
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from ai_recommendation_engine import AIRecommendationEngine
+from ai_risk_model import DigitalRiskAnalyzer
+from model_registry import ModelNotFoundError, ModelRegistry
+from risk_assessment import RiskAssessmentEngine
+
+SEVERITIES = ['low', 'medium', 'high', 'critical']
+DATA_TYPES = ['email', 'password', 'name', 'phone', 'address', 'ssn', 'credit_card',
+              'bank_account', 'security_question', 'passport']
+EXPOSURE_TYPES = ['public_profile', 'personal_info', 'location_data', 'financial_info', 'private_messages']
+PLATFORMS = ['Facebook', 'Instagram', 'Twitter', 'LinkedIn', 'TikTok', 'Reddit', 'Snapchat', 'Pinterest']
+RISK_LEVELS = ['low', 'medium', 'high']
+
+# Metrics compared against a baseline, and whether a larger value is better
+TRACKED_METRICS = {'throughput': True, 'p50_ms': False, 'p99_ms': False, 'peak_memory_kb': False}
+
+# name -> setup(context) returning (fn, inputs, items_per_call)
+BENCHMARKS: Dict[str, Callable[[Dict], Tuple[Callable, List, int]]] = {}
+
+
+def benchmark(name: str):
+    """Register a benchmark setup function"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def generate_users(n_users: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Synthetic users with 0-200 breaches and 0-50 social exposures (long-tailed)"""
+    rng = np.random.default_rng(seed)
+    today = date.today()
+    users = []
+    for user_id in range(n_users):
+        n_breaches = min(200, int(rng.negative_binomial(1, 0.05)))
+        n_exposures = min(50, int(rng.negative_binomial(1, 0.15)))
+        breaches = [
+            {
+                'breach_name': f'Breach {int(rng.integers(10000))}',
+                'severity': SEVERITIES[rng.integers(len(SEVERITIES))],
+                'data_types': [DATA_TYPES[i] for i in rng.choice(len(DATA_TYPES), rng.integers(1, 5), replace=False)],
+                'breach_date': today - timedelta(days=int(rng.integers(0, 3650)))
+            }
+            for _ in range(n_breaches)
+        ]
+        exposures = [
+            {
+                'platform': PLATFORMS[rng.integers(len(PLATFORMS))],
+                'exposure_type': EXPOSURE_TYPES[rng.integers(len(EXPOSURE_TYPES))],
+                'risk_level': RISK_LEVELS[rng.integers(len(RISK_LEVELS))]
+            }
+            for _ in range(n_exposures)
+        ]
+        users.append({'user_id': user_id, 'email': f'user{user_id}@example.com',
+                      'breaches': breaches, 'exposures': exposures})
+    return users
+
+
+def generate_ner_corpus(n_sentences: int, seed: int = 0) -> Dict[str, List]:
+    """Token/ner_tags examples shaped like the enhanced_pii_trainer dataset"""
+    rng = np.random.default_rng(seed)
+    words = ['My', 'name', 'is', 'and', 'I', 'live', 'in', 'call', 'me', 'at', 'email', 'the', 'on']
+    names = ['John', 'Sarah', 'Priya', 'Miguel', 'Doe', 'Johnson', 'Kumar']
+    tokens, tags = [], []
+    for _ in range(n_sentences):
+        length = int(rng.integers(5, 60))
+        sentence, sentence_tags = [], []
+        for _ in range(length):
+            kind = rng.random()
+            if kind < 0.1:
+                sentence.append(names[rng.integers(len(names))]); sentence_tags.append(1)
+            elif kind < 0.15:
+                sentence.append(f'user{rng.integers(1000)}@example.com'); sentence_tags.append(7)
+            elif kind < 0.2:
+                sentence.append(f'555-{rng.integers(1000):03d}-{rng.integers(10000):04d}'); sentence_tags.append(9)
+            else:
+                sentence.append(words[rng.integers(len(words))]); sentence_tags.append(0)
+        tokens.append(sentence)
+        tags.append(sentence_tags)
+    return {'tokens': tokens, 'ner_tags': tags}
+
+
+def to_columns(users: List[Dict]) -> Tuple[Dict[str, List], Dict[str, List]]:
+    """Columnar breach/exposure tables for calculate_overall_risk_batch"""
+    breaches = {'user_id': [], 'severity': [], 'data_types': [], 'breach_date': []}
+    exposures = {'user_id': [], 'exposure_type': [], 'risk_level': []}
+    for user in users:
+        for breach in user['breaches']:
+            breaches['user_id'].append(user['user_id'])
+            breaches['severity'].append(breach['severity'])
+            breaches['data_types'].append(breach['data_types'])
+            breaches['breach_date'].append(breach['breach_date'])
+        for exposure in user['exposures']:
+            exposures['user_id'].append(user['user_id'])
+            exposures['exposure_type'].append(exposure['exposure_type'])
+            exposures['risk_level'].append(exposure['risk_level'])
+    return breaches, exposures
+
+
+@benchmark('risk_assessment.calculate_overall_risk')
+def bench_overall_risk(context):
+    engine = RiskAssessmentEngine()
+    return (lambda user: engine.calculate_overall_risk(user['breaches'], user['exposures']),
+            context['users'], 1)
+
+
+@benchmark('risk_assessment.calculate_overall_risk_batch')
+def bench_overall_risk_batch(context):
+    engine = RiskAssessmentEngine()
+    users = context['users']
+    batch_size = context['batch_size']
+    batches = [to_columns(users[start:start + batch_size]) for start in range(0, len(users), batch_size)]
+    return (lambda batch: engine.calculate_overall_risk_batch(*batch), batches, batch_size)
+
+
+@benchmark('ai_recommendation.analyze_user_risk_profile')
+def bench_risk_profile(context):
+    engine = AIRecommendationEngine()
+    return (lambda user: engine.analyze_user_risk_profile(user['breaches'], user['exposures']),
+            context['users'], 1)
+
+
+@benchmark('ai_recommendation.generate_personalized_recommendations')
+def bench_recommendations(context):
+    engine = AIRecommendationEngine()
+    inputs = [
+        (engine.analyze_user_risk_profile(user['breaches'], user['exposures']), user)
+        for user in context['users']
+    ]
+    return (lambda item: engine.generate_personalized_recommendations(item[0], item[1]['breaches'],
+                                                                      item[1]['exposures']),
+            inputs, 1)
+
+
+@benchmark('ai_recommendation.generate_personalized_recommendations_batch')
+def bench_recommendations_batch(context):
+    engine = AIRecommendationEngine()
+    users = context['users']
+    batch_size = context['batch_size']
+    batches = [
+        ([user['breaches'] for user in users[start:start + batch_size]],
+         [user['exposures'] for user in users[start:start + batch_size]])
+        for start in range(0, len(users), batch_size)
+    ]
+    return (lambda batch: engine.generate_personalized_recommendations_batch(*batch), batches, batch_size)
+
+
+@benchmark('ai_recommendation.generate_educational_content')
+def bench_educational_content(context):
+    engine = AIRecommendationEngine()
+    profiles = [engine.analyze_user_risk_profile(user['breaches'], user['exposures']) for user in context['users']]
+    return engine.generate_educational_content, profiles, 1
+
+
+@benchmark('ai_risk_model.calculate_risk_score')
+def bench_risk_score(context):
+    analyzer = context['analyzer']
+    return analyzer.calculate_risk_score, [user['email'] for user in context['users']], 1
+
+
+@benchmark('ai_risk_model.calculate_risk_scores')
+def bench_risk_scores(context):
+    analyzer = context['analyzer']
+    emails = [user['email'] for user in context['users']]
+    batch_size = context['batch_size']
+    batches = [emails[start:start + batch_size] for start in range(0, len(emails), batch_size)]
+    return analyzer.calculate_risk_scores, batches, batch_size
+
+
+@benchmark('enhanced_pii_trainer.tokenize_and_align_labels')
+def bench_tokenize(context):
+    # Needs transformers and a cached tokenizer; skipped when either is unavailable
+    from enhanced_pii_trainer import tokenize_and_align_labels
+    from transformers import AutoTokenizer
+    tokenizer = AutoTokenizer.from_pretrained(context['tokenizer'])
+    corpus = context['ner_corpus']
+    batch_size = 1000
+    batches = [
+        {key: values[start:start + batch_size] for key, values in corpus.items()}
+        for start in range(0, len(corpus['tokens']), batch_size)
+    ]
+    return (lambda batch: tokenize_and_align_labels(batch, tokenizer), batches, batch_size)
+
+
+def load_analyzer(model_name: str) -> DigitalRiskAnalyzer:
+    """Use the registry's model if one exists, otherwise train a small throwaway one"""
+    analyzer = DigitalRiskAnalyzer(model_name=model_name)
+    try:
+        analyzer.load_model()
+    except ModelNotFoundError:
+        analyzer = DigitalRiskAnalyzer(registry=ModelRegistry(tempfile.mkdtemp(prefix='risk-bench-')))
+        analyzer.train_model(n_samples=10000)
+    return analyzer
+
+
+def run_benchmark(fn: Callable, inputs: List, items_per_call: int, memory_sample: int = 20) -> Dict[str, float]:
+    """Time every call, then measure peak traced memory over a small sample"""
+    fn(inputs[0])  # warm up
+
+    latencies = np.empty(len(inputs))
+    start = time.perf_counter()
+    for i, item in enumerate(inputs):
+        call_start = time.perf_counter()
+        fn(item)
+        latencies[i] = time.perf_counter() - call_start
+    elapsed = time.perf_counter() - start
+
+    # tracemalloc slows calls down, so memory is sampled separately from timing
+    tracemalloc.start()
+    peak = 0
+    for item in inputs[:memory_sample]:
+        tracemalloc.reset_peak()
+        fn(item)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    return {
+        'calls': len(inputs),
+        'throughput': round(len(inputs) * items_per_call / elapsed, 1),
+        'p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 4),
+        'p99_ms': round(float(np.percentile(latencies, 99)) * 1000, 4),
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+
+def find_regressions(results: Dict[str, Dict], baseline: Dict[str, Dict], max_regression: float) -> List[str]:
+    """Describe every tracked metric that got worse than baseline by more than max_regression percent"""
+    regressions = []
+    for name, metrics in results.items():
+        if name not in baseline or 'skipped' in metrics or 'skipped' in baseline[name]:
+            continue
+        for metric, higher_is_better in TRACKED_METRICS.items():
+            before, after = baseline[name][metric], metrics[metric]
+            if not before:
+                continue
+            change = (after - before) / before * 100
+            worse_by = -change if higher_is_better else change
+            if worse_by > max_regression:
+                regressions.append(f"{name} {metric}: {before} -> {after} ({worse_by:.1f}% worse)")
+    return regressions
+
+
+def print_report(results: Dict[str, Dict]):
+    """Print results as a plain-text table"""
+    header = f"{'benchmark':<64} {'items/s':>12} {'p50 ms':>10} {'p99 ms':>10} {'peak KB':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, metrics in results.items():
+        if 'skipped' in metrics:
+            print(f"{name:<64} skipped: {metrics['skipped']}")
+            continue
+        print(f"{name:<64} {metrics['throughput']:>12} {metrics['p50_ms']:>10} "
+              f"{metrics['p99_ms']:>10} {metrics['peak_memory_kb']:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scripts/ engines")
+    parser.add_argument('--users', type=int, default=2000, help="Synthetic users per benchmark")
+    parser.add_argument('--sentences', type=int, default=5000, help="Synthetic NER sentences")
+    parser.add_argument('--batch-size', type=int, default=500, help="Users per call for batch entry points")
+    parser.add_argument('--only', nargs='+', help="Run only benchmarks whose name contains one of these")
+    parser.add_argument('--model-name', default='risk_model', help="Registry model for DigitalRiskAnalyzer")
+    parser.add_argument('--tokenizer', default='dslim/bert-base-NER')
+    parser.add_argument('--json', help="Write results to this file (usable as a later --baseline)")
+    parser.add_argument('--baseline', help="Results file from an earlier run to compare against")
+    parser.add_argument('--max-regression', type=float, default=10.0,
+                        help="Fail when a tracked metric is worse than baseline by more than this percent")
+    args = parser.parse_args()
+
+    selected = [
+        name for name in BENCHMARKS
+        if not args.only or any(pattern in name for pattern in args.only)
+    ]
+    context = {
+        'users': generate_users(args.users),
+        'ner_corpus': generate_ner_corpus(args.sentences),
+        'batch_size': args.batch_size,
+        'tokenizer': args.tokenizer
+    }
+    if any(name.startswith('ai_risk_model.') for name in selected):
+        context['analyzer'] = load_analyzer(args.model_name)
+
+    results = {}
+    for name in selected:
+        try:
+            fn, inputs, items_per_call = BENCHMARKS[name](context)
+        except (ImportError, OSError) as error:
+            results[name] = {'skipped': f"{type(error).__name__}: {error}"}
+            continue
+        results[name] = run_benchmark(fn, inputs, items_per_call)
+
+    print_report(results)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = find_regressions(results, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.max_regression}%:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo tracked metric regressed by more than {args.max_regression}%")
@@ -0,0 +1,175 @@
+"""
+Local Breach Index
+Sorted, memory-mapped SHA-1 index of breached emails built from CSV/NDJSON corpora,
+queried by binary search or HaveIBeenPwned-style k-anonymity prefix ranges
+"""
+
+import csv
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+DIGESTS_FILE = 'digests.npy'
+BREACH_IDS_FILE = 'breach_ids.npy'
+CATALOG_FILE = 'breaches.json'
+
+DIGEST_DTYPE = np.dtype('S20')
+
+
+def email_digest(email: str) -> bytes:
+    """SHA-1 of the normalized (trimmed, lowercased) email"""
+    return hashlib.sha1(email.strip().lower().encode()).digest()
+
+
+class BreachIndex:
+    """
+    Read-only view over an index directory. The digest and breach id arrays are
+    memory-mapped, so every worker process that opens the same index shares its pages.
+    """
+
+    def __init__(self, index_dir: str):
+        self.index_dir = index_dir
+        self.digests = np.load(os.path.join(index_dir, DIGESTS_FILE), mmap_mode='r')
+        self.breach_ids = np.load(os.path.join(index_dir, BREACH_IDS_FILE), mmap_mode='r')
+        with open(os.path.join(index_dir, CATALOG_FILE)) as f:
+            self.catalog = json.load(f)
+
+    def __len__(self):
+        return len(self.digests)
+
+    def lookup(self, email: str) -> List[Dict]:
+        """Breach records for an email, in the check_email_breaches format"""
+        return [
+            {**self.catalog[breach_id], 'data_types': list(self.catalog[breach_id]['data_types'])}
+            for breach_id in self.lookup_digest(email_digest(email))
+        ]
+
+    def lookup_digest(self, digest: bytes) -> List[int]:
+        """Breach ids recorded for a raw 20-byte SHA-1 digest"""
+        key = np.array([digest], dtype=DIGEST_DTYPE)
+        start = int(np.searchsorted(self.digests, key, side='left')[0])
+        end = int(np.searchsorted(self.digests, key, side='right')[0])
+        return self.breach_ids[start:end].tolist()
+
+    def range(self, prefix: str) -> List[Tuple[str, List[int]]]:
+        """
+        k-anonymity range query: every (hex suffix, breach ids) under a hex SHA-1 prefix,
+        so callers can match locally without revealing the full hash.
+        """
+        prefix = prefix.upper()
+        bits = 4 * len(prefix)
+        if not 0 < bits <= 160:
+            raise ValueError("prefix must be 1-40 hex characters")
+
+        value = int(prefix, 16)
+        start = self._bound(value << (160 - bits))
+        end = self._bound((value + 1) << (160 - bits)) if value + 1 < (1 << bits) else len(self.digests)
+
+        matches: Dict[str, List[int]] = {}
+        for digest, breach_id in zip(self.digests[start:end], self.breach_ids[start:end]):
+            suffix = digest.ljust(20, b'\x00').hex().upper()[len(prefix):]
+            matches.setdefault(suffix, []).append(int(breach_id))
+        return list(matches.items())
+
+    def _bound(self, value: int) -> int:
+        """Position of the first digest >= a 160-bit integer"""
+        key = np.array([value.to_bytes(20, 'big')], dtype=DIGEST_DTYPE)
+        return int(np.searchsorted(self.digests, key, side='left')[0])
+
+
+def iter_corpus(path: str) -> Iterator[Dict]:
+    """
+    Yield raw records from a .csv or .ndjson/.jsonl corpus file. Each record has an
+    'email' (or precomputed hex 'sha1'), a 'breach' name and optional 'date' and
+    'data_types' (a list, or a ';'-separated string in CSV).
+    """
+    if path.endswith('.csv'):
+        with open(path, newline='') as f:
+            yield from csv.DictReader(f)
+    elif path.endswith(('.ndjson', '.jsonl')):
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"Unsupported corpus format: {path} (expected .csv, .ndjson or .jsonl)")
+
+
+def build_breach_index(sources: Iterable[str], output_dir: str) -> BreachIndex:
+    """Ingest corpus files into a sorted, de-duplicated index directory"""
+    catalog: List[Dict] = []
+    breach_lookup: Dict[str, int] = {}
+    digests = bytearray()
+    breach_ids = []
+
+    for path in sources:
+        for record in iter_corpus(path):
+            name = record['breach']
+            if name not in breach_lookup:
+                breach_lookup[name] = len(catalog)
+                catalog.append({'site': name, 'date': record.get('date') or '', 'data_types': []})
+            breach_id = breach_lookup[name]
+
+            data_types = record.get('data_types') or []
+            if isinstance(data_types, str):
+                data_types = [value.strip() for value in data_types.split(';') if value.strip()]
+            known_types = catalog[breach_id]['data_types']
+            known_types.extend(value for value in data_types if value not in known_types)
+
+            if record.get('sha1'):
+                digests += bytes.fromhex(record['sha1'])
+            else:
+                digests += email_digest(record['email'])
+            breach_ids.append(breach_id)
+
+    digest_array = np.frombuffer(bytes(digests), dtype=DIGEST_DTYPE)
+    breach_id_array = np.array(breach_ids, dtype=np.uint32)
+
+    # Sort by digest, then breach id, and drop duplicate (digest, breach) pairs
+    order = np.lexsort((breach_id_array, digest_array))
+    digest_array, breach_id_array = digest_array[order], breach_id_array[order]
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = (digest_array[1:] != digest_array[:-1]) | (breach_id_array[1:] != breach_id_array[:-1])
+
+    os.makedirs(output_dir, exist_ok=True)
+    _atomic_save(output_dir, DIGESTS_FILE, lambda f: np.save(f, digest_array[keep]))
+    _atomic_save(output_dir, BREACH_IDS_FILE, lambda f: np.save(f, breach_id_array[keep]))
+    _atomic_save(output_dir, CATALOG_FILE, lambda f: f.write(json.dumps(catalog, indent=2).encode()))
+
+    return BreachIndex(output_dir)
+
+
+def _atomic_save(output_dir: str, name: str, write):
+    """Write a file next to its destination and rename it into place"""
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{name}-', dir=output_dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, os.path.join(output_dir, name))
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or query a local breach index")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="Build an index from CSV/NDJSON corpora")
+    build_parser.add_argument('sources', nargs='+')
+    build_parser.add_argument('-o', '--output', required=True)
+    lookup_parser = subparsers.add_parser('lookup', help="Look up an email")
+    lookup_parser.add_argument('index')
+    lookup_parser.add_argument('email')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        index = build_breach_index(args.sources, args.output)
+        print(f"Indexed {len(index)} breach records across {len(index.catalog)} breaches")
+    else:
+        print(json.dumps(BreachIndex(args.index).lookup(args.email), indent=2))
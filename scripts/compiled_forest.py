@@ -0,0 +1,187 @@
+"""
+Compiled Risk Forest
+Flattens a fitted scikit-learn random forest (and its StandardScaler) into contiguous
+NumPy arrays so the scoring service can evaluate it without importing scikit-learn
+"""
+
+import numpy as np
+
+TREE_LEAF = -1
+
+
+class CompiledScaler:
+    """Array-only copy of a fitted StandardScaler"""
+
+    def __init__(self, mean=None, scale=None):
+        self.mean = mean
+        self.scale = scale
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        """Copy the fitted statistics out of a StandardScaler"""
+        return cls(
+            mean=np.ascontiguousarray(scaler.mean_) if scaler.with_mean else None,
+            scale=np.ascontiguousarray(scaler.scale_) if scaler.with_std else None
+        )
+
+    def transform(self, X):
+        """Same in-place subtract/divide StandardScaler.transform performs"""
+        X = np.array(X, dtype=np.float64)
+        if self.mean is not None:
+            X -= self.mean
+        if self.scale is not None:
+            X /= self.scale
+        return X
+
+
+class CompiledForest:
+    """
+    All trees of a forest concatenated into flat node arrays.
+
+    Internal nodes hold feature/threshold and a (left, right) row in children, as
+    global node ids; leaves have children TREE_LEAF. Leaf outputs are stored sparsely in CSR
+    form (value_indptr/value_index/value), one row per node: class probabilities for
+    classifiers, the single regression value for regressors.
+    """
+
+    def __init__(self, feature, threshold, children, roots, value_indptr, value_index,
+                 value, n_values, n_features, classes=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.roots = roots
+        self.value_indptr = value_indptr
+        self.value_index = value_index
+        self.value = value
+        self.n_values = n_values
+        self.n_features = n_features
+        self.classes = classes
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    @property
+    def nbytes(self):
+        """Total size of the compiled arrays"""
+        arrays = [
+            self.feature, self.threshold, self.children, self.roots,
+            self.value_indptr, self.value_index, self.value
+        ]
+        if self.classes is not None:
+            arrays.append(self.classes)
+        return sum(array.nbytes for array in arrays)
+
+    def apply(self, X):
+        """Leaf node id reached in every tree, shape (n_rows, n_trees)"""
+        # Trees compare float32 inputs against float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X must have shape (n_rows, {self.n_features})")
+        n_rows, n_trees = len(X), self.n_trees
+
+        flat_X = X.ravel()
+        flat_children = self.children.ravel()
+        nodes = np.tile(self.roots.astype(np.int64), n_rows)
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * self.n_features, n_trees)
+        active = np.flatnonzero(flat_children[2 * nodes] != TREE_LEAF)
+
+        # Level-synchronous traversal: every unfinished (row, tree) pair descends one level per step
+        while active.size:
+            current = nodes[active]
+            go_right = ~(flat_X[row_offsets[active] + self.feature[current]] <= self.threshold[current])
+            current = flat_children[2 * current + go_right]
+            nodes[active] = current
+            active = active[flat_children[2 * current] != TREE_LEAF]
+
+        return nodes.reshape(n_rows, n_trees)
+
+    def _accumulate(self, X):
+        """
+        Average leaf outputs over trees, adding them in tree order. This is the order a
+        forest with n_jobs=1 uses; threaded prediction adds trees in whatever order the
+        jobs finish, so it only agrees up to float rounding.
+        """
+        leaves = self.apply(X)
+        n_rows = len(leaves)
+        out = np.zeros((n_rows, self.n_values), dtype=np.float64)
+
+        starts = self.value_indptr[leaves]
+        counts = self.value_indptr[leaves + 1] - starts
+        for tree in range(self.n_trees):
+            tree_counts = counts[:, tree]
+            rows = np.repeat(np.arange(n_rows), tree_counts)
+            offsets = np.arange(tree_counts.sum()) - np.repeat(np.cumsum(tree_counts) - tree_counts, tree_counts)
+            entries = np.repeat(starts[:, tree], tree_counts) + offsets
+            out[rows, self.value_index[entries]] += self.value[entries]
+
+        out /= self.n_trees
+        return out
+
+    def predict_proba(self, X):
+        """Class probabilities, identical to RandomForestClassifier.predict_proba with n_jobs=1"""
+        if self.classes is None:
+            raise AttributeError("predict_proba is only available for compiled classifiers")
+        return self._accumulate(X)
+
+    def predict(self, X):
+        """Predictions, identical to the source forest's predict with n_jobs=1"""
+        out = self._accumulate(X)
+        if self.classes is None:
+            return out[:, 0]
+        return self.classes.take(np.argmax(out, axis=1), axis=0)
+
+
+def compile_forest(forest):
+    """Flatten a fitted single-output RandomForestClassifier/Regressor into a CompiledForest"""
+    estimators = getattr(forest, 'estimators_', None)
+    if estimators is None or not all(hasattr(estimator, 'tree_') for estimator in estimators):
+        raise ValueError(f"Only fitted random forests can be compiled, not {type(forest).__name__}")
+    if getattr(forest, 'n_outputs_', 1) != 1:
+        raise ValueError("Only single-output forests can be compiled")
+
+    is_classifier = hasattr(forest, 'classes_')
+    features, thresholds, children, roots = [], [], [], []
+    counts, value_index, values = [], [], []
+
+    offset = 0
+    for estimator in forest.estimators_:
+        tree = estimator.tree_
+        is_leaf = tree.children_left == TREE_LEAF
+
+        roots.append(offset)
+        features.append(np.where(is_leaf, 0, tree.feature))
+        thresholds.append(tree.threshold)
+        children.append(np.where(
+            is_leaf[:, np.newaxis], TREE_LEAF,
+            np.column_stack([tree.children_left, tree.children_right]) + offset
+        ))
+
+        value = np.ascontiguousarray(tree.value[:, 0, :])
+        if is_classifier:
+            # Same per-row normalization DecisionTreeClassifier.predict_proba applies
+            normalizer = value.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            value = value / normalizer
+
+        # Zero entries add nothing to the running sum, so only non-zero leaf outputs are kept
+        node_ids, column_ids = np.nonzero((value != 0) & is_leaf[:, np.newaxis])
+        counts.append(np.bincount(node_ids, minlength=tree.node_count))
+        value_index.append(column_ids)
+        values.append(value[node_ids, column_ids])
+
+        offset += tree.node_count
+
+    value_indptr = np.concatenate([[0], np.cumsum(np.concatenate(counts))])
+    return CompiledForest(
+        feature=np.concatenate(features).astype(np.int32),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        children=np.ascontiguousarray(np.concatenate(children), dtype=np.int32),
+        roots=np.array(roots, dtype=np.int32),
+        value_indptr=value_indptr.astype(np.int64),
+        value_index=np.concatenate(value_index).astype(np.int32),
+        value=np.concatenate(values).astype(np.float64),
+        n_values=len(forest.classes_) if is_classifier else 1,
+        n_features=forest.n_features_in_,
+        classes=np.asarray(forest.classes_) if is_classifier else None
+    )
@@ -3,9 +3,13 @@ Enhanced PII Detection Training Script
 Extends dslim/bert-base-NER to detect additional PII entities
 """
 
+import hashlib
 import json
 import os
-from datasets import Dataset, DatasetDict
+import shutil
+import pyarrow as pa
+import pyarrow.compute as pc
+from datasets import Dataset, DatasetDict, Features, Sequence, Value, load_from_disk
 from transformers import (
     AutoTokenizer, 
     AutoModelForTokenClassification, 
@@ -43,6 +47,21 @@ PII_LABELS = [
 label2id = {label: i for i, label in enumerate(PII_LABELS)}
 id2label = {i: label for label, i in label2id.items()}
 
+# B- tag ID -> the matching I- tag ID; other IDs map to themselves
+B_TO_I = [
+    label2id.get("I-" + label[2:], i) if label.startswith("B-") else i
+    for i, label in enumerate(PII_LABELS)
+]
+
+# Tokenized datasets are cached here, one directory per (tokenizer, dataset) key. The
+# cache lives next to the scripts unless overridden, so the working directory never matters.
+DATASET_CACHE_DIR = os.environ.get(
+    "PII_DATASET_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "pii-tokenized")
+)
+# Bump whenever tokenize_and_align_labels changes its output
+ALIGNMENT_VERSION = 1
+
 def create_sample_pii_dataset():
     """Create a sample PII dataset for training"""
     
@@ -50,7 +69,7 @@ def create_sample_pii_dataset():
     sample_data = [
         {
             "tokens": ["John", "Doe", "lives", "at", "123", "Main", "Street", ",", "New", "York"],
-            "ner_tags": [1, 2, 0, 0, 15, 16, 16, 0, 5, 6]  # B-PER, I-PER, O, O, B-ADDR, I-ADDR, I-ADDR, O, B-LOC, I-LOC
+            "ner_tags": [1, 2, 0, 0, 17, 18, 18, 0, 5, 6]  # B-PER, I-PER, O, O, B-ADDR, I-ADDR, I-ADDR, O, B-LOC, I-LOC
         },
         {
             "tokens": ["Contact", "me", "at", "john.doe@email.com", "or", "call", "555-123-4567"],
@@ -81,7 +100,7 @@ def create_sample_pii_dataset():
                 "ner_tags": [0, 0, 0, 7]
             },
             {
-                "tokens": ["Call", f"({_}00)", "555-{_:04d}"],
+                "tokens": ["Call", f"({_}00)", f"555-{_:04d}"],
                 "ner_tags": [0, 9, 10]
             }
         ])
@@ -98,35 +117,136 @@ def create_sample_pii_dataset():
         "test": Dataset.from_list(test_data)
     })
 
-def tokenize_and_align_labels(examples, tokenizer):
-    """Tokenize and align labels for NER training"""
-    tokenized_inputs = tokenizer(
-        examples["tokens"], 
-        truncation=True, 
-        is_split_into_words=True,
-        padding=True
-    )
-    
+def align_labels(word_ids, ner_tags, label_all_tokens=False):
+    """
+    Token labels for a batch: the first subword of each word gets the word's tag and
+    special tokens -100. Continuation subwords get -100, or the I- form of the word's
+    tag with label_all_tokens.
+    """
     labels = []
-    for i, label in enumerate(examples["ner_tags"]):
-        word_ids = tokenized_inputs.word_ids(batch_index=i)
+    for example_word_ids, label in zip(word_ids, ner_tags):
         previous_word_idx = None
         label_ids = []
         
-        for word_idx in word_ids:
+        for word_idx in example_word_ids:
             if word_idx is None:
                 label_ids.append(-100)
             elif word_idx != previous_word_idx:
                 label_ids.append(label[word_idx])
             else:
-                label_ids.append(-100)
+                label_ids.append(B_TO_I[label[word_idx]] if label_all_tokens else -100)
             previous_word_idx = word_idx
         
         labels.append(label_ids)
+    return labels
+
+def tokenize_and_align_labels(examples, tokenizer, max_length=None, label_all_tokens=False):
+    """Tokenize and align labels for NER training (unpadded; the data collator pads per batch)"""
+    tokenized_inputs = tokenizer(
+        examples["tokens"], 
+        truncation=True, 
+        is_split_into_words=True,
+        max_length=max_length
+    )
     
-    tokenized_inputs["labels"] = labels
+    word_ids = [tokenized_inputs.word_ids(batch_index=i) for i in range(len(examples["tokens"]))]
+    tokenized_inputs["labels"] = align_labels(word_ids, examples["ner_tags"], label_all_tokens)
     return tokenized_inputs
 
+def tokenizer_fingerprint(tokenizer):
+    """Hash of the tokenizer's vocabulary, normalization and special tokens"""
+    hasher = hashlib.sha256(type(tokenizer).__name__.encode())
+    if getattr(tokenizer, "is_fast", False):
+        state = json.loads(tokenizer.backend_tokenizer.to_str())
+        # Truncation and padding are per-call settings, not part of the tokenizer
+        state.pop("truncation", None)
+        state.pop("padding", None)
+        hasher.update(json.dumps(state, sort_keys=True).encode())
+    else:
+        hasher.update(json.dumps(sorted(tokenizer.get_vocab().items())).encode())
+        hasher.update(json.dumps(tokenizer.init_kwargs, sort_keys=True, default=str).encode())
+    hasher.update(str(tokenizer.model_max_length).encode())
+    return hasher.hexdigest()
+
+def _hash_array(hashers, path, array):
+    """
+    Feed an Arrow array into one hasher per nesting level and buffer kind, so the
+    digest depends on the values only, not on how the table happens to be chunked
+    """
+    def update(kind, data):
+        hashers.setdefault(path + (kind,), hashlib.sha256()).update(data)
+    
+    if pa.types.is_list(array.type) or pa.types.is_large_list(array.type):
+        update("lengths", pc.list_value_length(array).to_numpy(zero_copy_only=False).astype(np.int64).tobytes())
+        _hash_array(hashers, path + ("values",), array.flatten())
+    elif pa.types.is_string(array.type) or pa.types.is_binary(array.type) or \
+            pa.types.is_large_string(array.type) or pa.types.is_large_binary(array.type):
+        offset_type = np.int32 if pa.types.is_string(array.type) or pa.types.is_binary(array.type) else np.int64
+        offsets = np.frombuffer(array.buffers()[1], dtype=offset_type)[array.offset:array.offset + len(array) + 1]
+        update("lengths", np.diff(offsets).astype(np.int64).tobytes())
+        if len(array) and array.buffers()[2] is not None:
+            update("bytes", memoryview(array.buffers()[2])[offsets[0]:offsets[-1]])
+    else:
+        update("values", array.to_numpy(zero_copy_only=False).tobytes())
+
+def dataset_fingerprint(dataset, batch_size=10000):
+    """Content hash of a Dataset's columns, independent of how it was built or chunked"""
+    hashers = {}
+    for batch in dataset.with_format("arrow").iter(batch_size=batch_size):
+        for name in batch.column_names:
+            for chunk in batch.column(name).chunks:
+                _hash_array(hashers, (name,), chunk)
+    
+    summary = {"/".join(path): hasher.hexdigest() for path, hasher in hashers.items()}
+    summary["num_rows"] = dataset.num_rows
+    summary["features"] = str(dataset.features)
+    return hashlib.sha256(json.dumps(summary, sort_keys=True).encode()).hexdigest()
+
+def load_tokenized_dataset(dataset, tokenizer, cache_dir=DATASET_CACHE_DIR, max_length=None, label_all_tokens=False):
+    """
+    The tokenized, label-aligned DatasetDict. It is built once per tokenizer and dataset
+    content and saved as Arrow files; later runs (and this one, after building) memory-map
+    them instead of tokenizing again.
+    """
+    key = hashlib.sha256(json.dumps({
+        "tokenizer": tokenizer_fingerprint(tokenizer),
+        "splits": {split: dataset_fingerprint(data) for split, data in dataset.items()},
+        "labels": PII_LABELS,
+        "max_length": max_length,
+        "label_all_tokens": label_all_tokens,
+        "alignment": ALIGNMENT_VERSION
+    }, sort_keys=True).encode()).hexdigest()[:32]
+    path = os.path.join(cache_dir, key)
+    
+    if not os.path.exists(os.path.join(path, "dataset_dict.json")):
+        # Compact integer columns; the collator widens them when it builds tensors
+        features = Features({
+            name: Sequence(Value("int32" if name == "input_ids" else "int8"))
+            for name in tokenizer(["a"], is_split_into_words=True).keys()
+        })
+        features["labels"] = Sequence(Value("int16"))
+        
+        tokenized = DatasetDict({
+            split: data.map(
+                lambda examples: tokenize_and_align_labels(examples, tokenizer, max_length, label_all_tokens),
+                batched=True,
+                remove_columns=data.column_names,
+                features=features,
+                new_fingerprint=f"{key}-{split}"
+            )
+            for split, data in dataset.items()
+        })
+        # Write to a private directory and rename, so concurrent runs never see a partial cache
+        staging = f"{path}.tmp-{os.getpid()}"
+        tokenized.save_to_disk(staging)
+        try:
+            os.rename(staging, path)
+        except OSError:
+            # Another run finished the same cache first
+            shutil.rmtree(staging, ignore_errors=True)
+    
+    return load_from_disk(path)
+
 def compute_metrics(eval_pred):
     """Compute evaluation metrics"""
     metric = evaluate.load("seqeval")
@@ -151,11 +271,12 @@ def compute_metrics(eval_pred):
         "accuracy": results["overall_accuracy"],
     }
 
-def train_enhanced_pii_model():
+def train_enhanced_pii_model(dataset=None, cache_dir=DATASET_CACHE_DIR):
     """Train the enhanced PII detection model"""
     
-    print("Creating sample PII dataset...")
-    dataset = create_sample_pii_dataset()
+    if dataset is None:
+        print("Creating sample PII dataset...")
+        dataset = create_sample_pii_dataset()
     
     print("Loading base model and tokenizer...")
     model_name = "dslim/bert-base-NER"
@@ -167,13 +288,10 @@ def train_enhanced_pii_model():
         label2id=label2id
     )
     
-    print("Tokenizing dataset...")
-    tokenized_dataset = dataset.map(
-        lambda examples: tokenize_and_align_labels(examples, tokenizer),
-        batched=True
-    )
+    print("Loading tokenized dataset...")
+    tokenized_dataset = load_tokenized_dataset(dataset, tokenizer, cache_dir)
     
-    # Data collator
+    # Data collator (pads each batch to its own longest sequence)
     data_collator = DataCollatorForTokenClassification(tokenizer)
     
     # Training arguments
@@ -218,4 +336,14 @@ def train_enhanced_pii_model():
     return trainer
 
 if __name__ == "__main__":
-    trainer = train_enhanced_pii_model()
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Fine-tune the enhanced PII NER model")
+    parser.add_argument("--corpus", help="Directory written by pii_corpus_generator.py (default: built-in sample dataset)")
+    args = parser.parse_args()
+    
+    dataset = None
+    if args.corpus:
+        from pii_corpus_generator import load_corpus
+        dataset = load_corpus(args.corpus)
+    trainer = train_enhanced_pii_model(dataset)
@@ -0,0 +1,255 @@
+"""
+Incremental Risk Scoring
+Per-user running totals that let RiskAssessmentEngine.calculate_overall_risk be kept
+current as breaches and exposures arrive, without revisiting the user's history
+"""
+
+import heapq
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from risk_assessment import RiskAssessmentEngine
+from scoring_context import RECENCY_BUCKETS, RECENCY_LIMITS
+
+# Indexes of the RECENCY_BUCKETS, plus one for undated breaches, which are not decayed
+DAYS_30, DAYS_90, DAYS_365, OLDER, UNDATED = range(5)
+BUCKET_LIMITS = list(enumerate(RECENCY_LIMITS))
+
+
+class StaleWeightsError(ValueError):
+    """Raised when a RiskScoreState was accumulated under a different weight set"""
+
+
+def recency_bucket(days_ago: int) -> int:
+    for bucket, limit in BUCKET_LIMITS:
+        if days_ago <= limit:
+            return bucket
+    return OLDER
+
+
+def next_transition(breach_day: int, bucket: int) -> Optional[int]:
+    """Ordinal day on which a breach leaves its bucket, or None once it no longer decays"""
+    if bucket >= OLDER:
+        return None
+    return breach_day + BUCKET_LIMITS[bucket][1] + 1
+
+
+@dataclass
+class RiskScoreState:
+    """
+    Serializable running totals for one user, as of the ordinal day as_of.
+
+    Breach base scores (severity plus data type weights) are summed per recency bucket,
+    so a bucket's multiplier is applied once. Breaches that can still move to an older
+    bucket wait in pending, a heap of (transition day, breach day, base score, bucket).
+    Totals are already weighted, so weights_fingerprint records the weight set they
+    were accumulated under.
+    """
+
+    as_of: int
+    bucket_scores: List[float] = field(default_factory=lambda: [0.0] * 5)
+    bucket_counts: List[int] = field(default_factory=lambda: [0] * 5)
+    pending: List[Tuple[int, int, float, int]] = field(default_factory=list)
+    social_total: float = 0.0
+    exposure_count: int = 0
+    high_risk_exposures: int = 0
+    weights_fingerprint: Optional[str] = None
+
+    @property
+    def breach_count(self) -> int:
+        return sum(self.bucket_counts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable form, to store next to the user row"""
+        return {
+            'as_of': date.fromordinal(self.as_of).isoformat(),
+            'bucket_scores': list(self.bucket_scores),
+            'bucket_counts': list(self.bucket_counts),
+            'pending': [list(entry) for entry in self.pending],
+            'social_total': self.social_total,
+            'exposure_count': self.exposure_count,
+            'high_risk_exposures': self.high_risk_exposures,
+            'weights_fingerprint': self.weights_fingerprint
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'RiskScoreState':
+        return cls(
+            as_of=date.fromisoformat(data['as_of']).toordinal(),
+            bucket_scores=list(data['bucket_scores']),
+            bucket_counts=list(data['bucket_counts']),
+            pending=[tuple(entry) for entry in data['pending']],
+            social_total=data['social_total'],
+            exposure_count=data['exposure_count'],
+            high_risk_exposures=data['high_risk_exposures'],
+            weights_fingerprint=data.get('weights_fingerprint')
+        )
+
+
+class IncrementalRiskScorer:
+    """
+    Applies single breaches and exposures to a RiskScoreState in O(1) (O(log n) for a
+    breach that is still decaying) using an engine's weights. Scores match
+    calculate_overall_risk up to float summation order.
+
+    A state only accepts updates under the weight set it was built with. After a weight
+    reload, apply/score raise StaleWeightsError; rebuild the state with from_history.
+    """
+
+    def __init__(self, engine: Optional[RiskAssessmentEngine] = None):
+        self.engine = engine or RiskAssessmentEngine()
+
+    def new_state(self, as_of: Optional[date] = None) -> RiskScoreState:
+        return RiskScoreState(
+            as_of=(as_of or datetime.now().date()).toordinal(),
+            weights_fingerprint=self.engine.weights.fingerprint
+        )
+
+    def from_history(self, breaches: List[Dict], exposures: List[Dict],
+                     as_of: Optional[date] = None) -> RiskScoreState:
+        """Build a state from a full history once; later changes are applied incrementally"""
+        state = self.new_state(as_of)
+        for breach in breaches:
+            self.apply_breach(state, breach)
+        for exposure in exposures:
+            self.apply_exposure(state, exposure)
+        return state
+
+    def apply_breach(self, state: RiskScoreState, breach: Dict) -> Dict[str, Any]:
+        """Add one breach and return the updated score"""
+        weights = self._weights_for(state)
+        base_score = weights.breach_severity.weight(breach.get('severity', 'low'))
+        for data_type in breach.get('data_types', []):
+            base_score += weights.data_types.weight(data_type)
+
+        breach_date = breach.get('breach_date')
+        if breach_date:
+            breach_day = breach_date.toordinal()
+            bucket = recency_bucket(state.as_of - breach_day)
+            transition = next_transition(breach_day, bucket)
+            if transition is not None:
+                heapq.heappush(state.pending, (transition, breach_day, float(base_score), bucket))
+        else:
+            bucket = UNDATED
+
+        state.bucket_scores[bucket] += base_score
+        state.bucket_counts[bucket] += 1
+        return self.score(state)
+
+    def apply_exposure(self, state: RiskScoreState, exposure: Dict) -> Dict[str, Any]:
+        """Add one social exposure and return the updated score"""
+        weights = self._weights_for(state)
+        exposure_type = exposure.get('exposure_type', 'public_profile')
+        risk_level = exposure.get('risk_level', 'low')
+        state.social_total += weights.social_exposure.weight(exposure_type) * weights.risk_level_multiplier.weight(risk_level)
+        state.exposure_count += 1
+        state.high_risk_exposures += risk_level == 'high'
+        return self.score(state)
+
+    def _weights_for(self, state: RiskScoreState):
+        """The engine's weights, if they are the set the state's totals were accumulated under"""
+        weights = self.engine.weights
+        if state.weights_fingerprint != weights.fingerprint:
+            raise StaleWeightsError(
+                f"State was built with weights {state.weights_fingerprint}, engine now uses "
+                f"{weights.fingerprint}; rebuild it with from_history"
+            )
+        return weights
+
+    def rebucket(self, state: RiskScoreState, today: Optional[date] = None) -> int:
+        """
+        Advance the state to today, moving breaches whose age crossed a recency
+        boundary. Returns the number of moves; only breaches under a year old can move.
+        """
+        today_day = (today or datetime.now().date()).toordinal()
+        moved = 0
+        while state.pending and state.pending[0][0] <= today_day:
+            _, breach_day, base_score, bucket = heapq.heappop(state.pending)
+            new_bucket = recency_bucket(today_day - breach_day)
+            state.bucket_scores[bucket] -= base_score
+            state.bucket_counts[bucket] -= 1
+            state.bucket_scores[new_bucket] += base_score
+            state.bucket_counts[new_bucket] += 1
+            transition = next_transition(breach_day, new_bucket)
+            if transition is not None:
+                heapq.heappush(state.pending, (transition, breach_day, base_score, new_bucket))
+            moved += 1
+        state.as_of = max(state.as_of, today_day)
+        return moved
+
+    @staticmethod
+    def next_rebucket_date(state: RiskScoreState) -> Optional[date]:
+        """Earliest day on which rebucket() will change the score, for scheduling"""
+        return date.fromordinal(state.pending[0][0]) if state.pending else None
+
+    def score(self, state: RiskScoreState) -> Dict[str, Any]:
+        """Scores and privacy factors as calculate_overall_risk would report them on as_of"""
+        recency = self._weights_for(state).recency_by_bucket
+        breach_total = sum(
+            state.bucket_scores[bucket] * recency[bucket] for bucket in range(len(RECENCY_BUCKETS))
+        ) + state.bucket_scores[UNDATED]
+        breach_score = round(min(100, breach_total), 1) if state.breach_count else 0
+        social_score = round(min(100, state.social_total * 0.8), 1) if state.exposure_count else 0
+
+        privacy_factors = {
+            'email_in_breaches': state.breach_count > 0,
+            'social_media_public': state.exposure_count > 0,
+            'recent_activity': state.bucket_counts[DAYS_30] + state.bucket_counts[DAYS_90] > 0,
+            'high_risk_exposures': state.high_risk_exposures > 0
+        }
+        privacy_score = max(0, 100 - (
+            privacy_factors['email_in_breaches'] * 30 +
+            privacy_factors['social_media_public'] * 20 +
+            privacy_factors['recent_activity'] * 25 +
+            privacy_factors['high_risk_exposures'] * 15
+        ))
+
+        overall_score = (
+            breach_score * 0.5 +
+            social_score * 0.3 +
+            (100 - privacy_score) * 0.2
+        )
+        if overall_score >= 80:
+            risk_level = 'critical'
+        elif overall_score >= 60:
+            risk_level = 'high'
+        elif overall_score >= 40:
+            risk_level = 'medium'
+        else:
+            risk_level = 'low'
+
+        return {
+            'overall_score': round(overall_score, 1),
+            'risk_level': risk_level,
+            'breach_score': breach_score,
+            'breach_count': state.breach_count,
+            'social_score': social_score,
+            'exposure_count': state.exposure_count,
+            'privacy_score': privacy_score,
+            'privacy_factors': privacy_factors
+        }
+
+
+if __name__ == "__main__":
+    import json
+    from datetime import timedelta
+
+    scorer = IncrementalRiskScorer()
+    today = datetime.now().date()
+    state = scorer.from_history(
+        [{'severity': 'high', 'data_types': ['email', 'password'], 'breach_date': today - timedelta(days=20)}],
+        [{'exposure_type': 'location_data', 'risk_level': 'high'}],
+        as_of=today
+    )
+
+    # A newly published breach only touches this user's running totals
+    print(json.dumps(scorer.apply_breach(state, {
+        'severity': 'critical', 'data_types': ['ssn'], 'breach_date': today
+    }), indent=2))
+
+    # Nightly job: age breaches into their new recency buckets
+    print("Next rebucket due:", scorer.next_rebucket_date(state))
+    scorer.rebucket(state, today + timedelta(days=45))
+    print(json.dumps(scorer.score(state), indent=2))
+    print(json.dumps(state.to_dict()))
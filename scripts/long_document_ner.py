@@ -0,0 +1,288 @@
+"""
+Long Document NER
+Token classification over texts of any length: the text is tokenized once, in segments,
+into overlapping model-sized windows, and window predictions are stitched back into
+entity spans by character offset
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+
+SEGMENT_CHARS = 1 << 16
+
+
+@dataclass
+class Window:
+    """
+    One model input: input_ids with the tokenizer's special tokens, the character offsets
+    of its content tokens, and the slice [keep_start, keep_end) of content tokens this
+    window owns. Owned slices of consecutive windows tile the document exactly once.
+    """
+
+    input_ids: List[int]
+    offsets: np.ndarray
+    keep_start: int
+    keep_end: int
+    content_start: int
+
+
+def special_tokens(tokenizer: Any) -> Tuple[List[int], List[int]]:
+    """Special token ids the tokenizer puts before and after a single sequence"""
+    content = tokenizer('a', add_special_tokens=False)['input_ids']
+    full = tokenizer('a')['input_ids']
+    for start in range(len(full) - len(content) + 1):
+        if full[start:start + len(content)] == content:
+            return full[:start], full[start + len(content):]
+    raise ValueError(f"Cannot locate content tokens in {full}")
+
+
+def iter_token_segments(tokenizer: Any, text: str, segment_chars: int = SEGMENT_CHARS) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    (token ids, global character offsets) for consecutive slices of text, each cut at
+    whitespace so the pre-tokenizer sees the same words it would in one pass
+    """
+    start = 0
+    while start < len(text):
+        end = min(start + segment_chars, len(text))
+        if end < len(text):
+            cut = max(text.rfind(separator, start, end) for separator in (' ', '\n', '\t'))
+            if cut > start:
+                end = cut
+        encoding = tokenizer(text[start:end], add_special_tokens=False, return_offsets_mapping=True)
+        offsets = np.array(encoding['offset_mapping'], dtype=np.int64).reshape(-1, 2)
+        yield np.array(encoding['input_ids'], dtype=np.int64), offsets + start
+        start = end
+
+
+def iter_windows(tokenizer: Any, text: str, max_length: int = 512, stride: int = 128,
+                 segment_chars: int = SEGMENT_CHARS) -> Iterator[Window]:
+    """
+    Overlapping windows of at most max_length tokens (special tokens included) whose
+    starts are max_length - specials - stride tokens apart. Each window owns the tokens
+    outside half of each overlap, so every token is labelled by the window giving it the
+    most context on both sides. Only the tokens not yet windowed are held in memory.
+    """
+    prefix, suffix = special_tokens(tokenizer)
+    width = max_length - len(prefix) - len(suffix)
+    if not 0 <= stride < width:
+        raise ValueError(f"stride must be in [0, {width}) for max_length {max_length}")
+    step = width - stride
+    left, right = stride // 2, stride - stride // 2
+
+    ids = np.zeros(0, dtype=np.int64)
+    offsets = np.zeros((0, 2), dtype=np.int64)
+    base = 0
+    position = 0
+
+    def window(start: int, end: int, last: bool) -> Window:
+        local = slice(start - base, end - base)
+        return Window(
+            input_ids=prefix + ids[local].tolist() + suffix,
+            offsets=offsets[local],
+            keep_start=left if start else 0,
+            keep_end=end - start if last else width - right,
+            content_start=len(prefix)
+        )
+
+    for segment_ids, segment_offsets in iter_token_segments(tokenizer, text, segment_chars):
+        ids = np.concatenate([ids, segment_ids])
+        offsets = np.concatenate([offsets, segment_offsets])
+        # Only a window with tokens after it can be cut before the stream ends
+        while base + len(ids) - position > width:
+            yield window(position, position + width, last=False)
+            position += step
+            ids, offsets = ids[position - base:], offsets[position - base:]
+            base = position
+    if base + len(ids) > position:
+        yield window(position, base + len(ids), last=True)
+
+
+class EntityStitcher:
+    """
+    Streaming BIO grouping ("simple" aggregation) over owned token predictions fed in
+    document order: a span starts at a B- tag or a change of entity type and extends over
+    following I- tags of the same type, whichever window predicted them. B- on a subword
+    that continues the previous token stays in the current span.
+    """
+
+    def __init__(self, text: str, id2label: Dict[int, str], source: str = 'ner'):
+        self.text = text
+        self.source = source
+        self.labels = [self._split(id2label[label_id]) for label_id in range(len(id2label))]
+        self._current: Optional[Dict[str, Any]] = None
+
+    @staticmethod
+    def _split(label: str) -> Tuple[str, Optional[str]]:
+        if label == 'O':
+            return 'O', None
+        prefix, _, entity_type = label.partition('-')
+        return ('B', label) if not entity_type else (prefix, entity_type)
+
+    def feed(self, offsets: np.ndarray, label_ids: np.ndarray, scores: np.ndarray) -> List[Dict[str, Any]]:
+        """Add the next tokens; returns the entities they closed"""
+        closed = []
+        current = self._current
+        for (start, end), label_id, score in zip(offsets.tolist(), label_ids.tolist(), scores.tolist()):
+            if start == end:
+                continue
+            prefix, entity_type = self.labels[label_id]
+            if entity_type is None:
+                if current is not None:
+                    closed.append(current)
+                current = None
+            elif current is None or prefix == 'B' and start != current['end'] or current['entity_group'] != entity_type:
+                if current is not None:
+                    closed.append(current)
+                current = {'entity_group': entity_type, 'start': start, 'end': end, 'scores': [score]}
+            else:
+                current['end'] = end
+                current['scores'].append(score)
+        self._current = current
+        return [self._finish(entity) for entity in closed]
+
+    def close(self) -> List[Dict[str, Any]]:
+        """Entities still open at the end of the document"""
+        current, self._current = self._current, None
+        return [self._finish(current)] if current is not None else []
+
+    def _finish(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'entity_group': entity['entity_group'],
+            'word': self.text[entity['start']:entity['end']],
+            'start': entity['start'],
+            'end': entity['end'],
+            'score': round(float(np.mean(entity['scores'])), 4),
+            'source': self.source
+        }
+
+
+class SlidingWindowNER:
+    """
+    Runs a token-classification model over windows from iter_windows, batch_size windows
+    per forward pass. Working memory is one batch of windows and logits plus the
+    unwindowed tail of the current segment, whatever the document length.
+    """
+
+    def __init__(self, tokenizer: Any, model: Any, max_length: int = 512, stride: int = 128,
+                 batch_size: int = 16, segment_chars: int = SEGMENT_CHARS, device: str = 'cpu'):
+        self.tokenizer = tokenizer
+        self.model = model.to(device).eval()
+        self.max_length = min(max_length, model.config.max_position_embeddings)
+        self.stride = stride
+        self.batch_size = batch_size
+        self.segment_chars = segment_chars
+        self.device = device
+        self.id2label = model.config.id2label
+        self.stats = {'documents': 0, 'windows': 0, 'batches': 0, 'tokens': 0}
+
+    @classmethod
+    def from_pretrained(cls, name: str, local_files_only: bool = False, **kwargs) -> 'SlidingWindowNER':
+        from transformers import AutoModelForTokenClassification, AutoTokenizer
+
+        return cls(
+            AutoTokenizer.from_pretrained(name, local_files_only=local_files_only),
+            AutoModelForTokenClassification.from_pretrained(name, local_files_only=local_files_only),
+            **kwargs
+        )
+
+    def __call__(self, text: str) -> List[Dict[str, Any]]:
+        return list(self.iter_entities(text))
+
+    def iter_entities(self, text: str) -> Iterator[Dict[str, Any]]:
+        """Entities in document order, yielded as soon as the window after them is scored"""
+        self.stats['documents'] += 1
+        stitcher = EntityStitcher(text, self.id2label)
+        batch = []
+        for window in iter_windows(self.tokenizer, text, self.max_length, self.stride, self.segment_chars):
+            batch.append(window)
+            if len(batch) == self.batch_size:
+                yield from self._score(batch, stitcher)
+                batch = []
+        if batch:
+            yield from self._score(batch, stitcher)
+        yield from stitcher.close()
+
+    @torch.inference_mode()
+    def _score(self, windows: Sequence[Window], stitcher: EntityStitcher) -> List[Dict[str, Any]]:
+        width = max(len(window.input_ids) for window in windows)
+        input_ids = np.full((len(windows), width), self.tokenizer.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(windows), width), dtype=np.int64)
+        for row, window in enumerate(windows):
+            input_ids[row, :len(window.input_ids)] = window.input_ids
+            attention_mask[row, :len(window.input_ids)] = 1
+        logits = self.model(
+            input_ids=torch.from_numpy(input_ids).to(self.device),
+            attention_mask=torch.from_numpy(attention_mask).to(self.device)
+        ).logits
+        probabilities = torch.softmax(logits.float(), dim=-1).cpu().numpy()
+
+        self.stats['windows'] += len(windows)
+        self.stats['batches'] += 1
+        entities = []
+        for window, window_probabilities in zip(windows, probabilities):
+            owned = window_probabilities[window.content_start + window.keep_start:window.content_start + window.keep_end]
+            label_ids = owned.argmax(axis=-1)
+            self.stats['tokens'] += len(label_ids)
+            entities.extend(stitcher.feed(
+                window.offsets[window.keep_start:window.keep_end],
+                label_ids,
+                owned[np.arange(len(label_ids)), label_ids]
+            ))
+        return entities
+
+
+def synthetic_document(n_chars: int, seed: int = 0) -> str:
+    """Scraped-page-like filler with contact details scattered through it"""
+    rng = np.random.default_rng(seed)
+    words = "the profile page lists posts comments photos and friends of this account updated daily".split()
+    details = ["John Doe", "john.doe@example.com", "555-123-4567", "Pune", "123-45-6789"]
+    parts, size = [], 0
+    while size < n_chars:
+        part = details[rng.integers(len(details))] if rng.random() < 0.02 else words[rng.integers(len(words))]
+        parts.append(part)
+        size += len(part) + 1
+    return " ".join(parts)[:n_chars]
+
+
+if __name__ == "__main__":
+    import argparse
+    import resource
+    import tempfile
+
+    parser = argparse.ArgumentParser(description="Benchmark sliding-window NER on long documents")
+    parser.add_argument('--model', help="Token-classification checkpoint (default: tiny random local BERT)")
+    parser.add_argument('--size-mb', nargs='+', type=float, default=[0.25, 1.0, 2.0])
+    parser.add_argument('--max-length', type=int, default=512)
+    parser.add_argument('--stride', type=int, default=128)
+    parser.add_argument('--batch-size', type=int, default=16)
+    args = parser.parse_args()
+
+    if args.model:
+        ner = SlidingWindowNER.from_pretrained(args.model, max_length=args.max_length, stride=args.stride,
+                                               batch_size=args.batch_size)
+    else:
+        from pii_scan_service import build_tiny_checkpoints
+
+        path = build_tiny_checkpoints(tempfile.mkdtemp(prefix='long-ner-'))['ner']
+        ner = SlidingWindowNER.from_pretrained(path, local_files_only=True, max_length=args.max_length,
+                                               stride=args.stride, batch_size=args.batch_size)
+    torch.set_grad_enabled(False)
+    ner(synthetic_document(10_000))
+
+    header = f"{'size MB':>8} {'tokens':>10} {'windows':>8} {'entities':>9} {'seconds':>8} {'tokens/s':>10} {'peak RSS MB':>12}"
+    print(header)
+    print("-" * len(header))
+    for size in args.size_mb:
+        text = synthetic_document(int(size * 1_000_000))
+        before = dict(ner.stats)
+        start = time.perf_counter()
+        n_entities = sum(1 for _ in ner.iter_entities(text))
+        elapsed = time.perf_counter() - start
+        tokens = ner.stats['tokens'] - before['tokens']
+        windows = ner.stats['windows'] - before['windows']
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{size:>8} {tokens:>10} {windows:>8} {n_entities:>9} {elapsed:>8.2f} {tokens / elapsed:>10.0f} {peak_mb:>12.1f}")
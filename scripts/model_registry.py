@@ -0,0 +1,165 @@
+"""
+Model Registry for Digital Footprint Risk Models
+Versioned, content-addressed storage for fitted risk models and their scalers
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+
+# Registry lives next to the scripts unless overridden, so the working directory never matters
+DEFAULT_REGISTRY_DIR = os.environ.get(
+    'RISK_MODEL_REGISTRY',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models')
+)
+
+ARTIFACT_FILE = 'artifact.joblib'
+METADATA_FILE = 'metadata.json'
+LATEST_FILE = 'LATEST'
+
+# Process-wide cache so every analyzer in a worker shares one loaded copy
+_loaded_artifacts: Dict[str, Tuple[Any, Any, Dict[str, Any]]] = {}
+
+
+class ModelNotFoundError(FileNotFoundError):
+    """Raised when no trained artifact exists for a model name/version"""
+
+
+class ModelRegistry:
+    """
+    Stores a fitted model and its scaler as a single uncompressed joblib artifact
+    under <root>/<name>/<version>/, where version is derived from the artifact's
+    SHA-256. Uncompressed artifacts can be loaded with mmap_mode so that forked
+    workers share the same pages.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = os.path.abspath(root or DEFAULT_REGISTRY_DIR)
+
+    def save(self, name: str, model: Any, scaler: Any, metadata: Optional[Dict] = None) -> Dict[str, Any]:
+        """Save model and scaler together and mark them as the latest version"""
+        model_dir = os.path.join(self.root, name)
+        os.makedirs(model_dir, exist_ok=True)
+
+        staging_dir = tempfile.mkdtemp(prefix='.staging-', dir=model_dir)
+        try:
+            artifact_path = os.path.join(staging_dir, ARTIFACT_FILE)
+            # compress=0 keeps numpy buffers page-aligned for mmap_mode loads
+            joblib.dump({'model': model, 'scaler': scaler}, artifact_path, compress=0)
+
+            sha256 = self._file_sha256(artifact_path)
+            version = sha256[:12]
+            record = {
+                'name': name,
+                'version': version,
+                'sha256': sha256,
+                'created_at': datetime.now().isoformat(),
+                'model_class': type(model).__name__,
+                'scaler_class': type(scaler).__name__,
+                'library_versions': self._library_versions(),
+                **(metadata or {})
+            }
+            with open(os.path.join(staging_dir, METADATA_FILE), 'w') as f:
+                json.dump(record, f, indent=2)
+
+            version_dir = os.path.join(model_dir, version)
+            if os.path.isdir(version_dir):
+                # Identical content was saved before; keep the existing copy
+                shutil.rmtree(staging_dir)
+            else:
+                os.rename(staging_dir, version_dir)
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+
+        self._write_latest(model_dir, version)
+        return self.get_metadata(name, version)
+
+    def load(self, name: str, version: Optional[str] = None, mmap_mode: Optional[str] = 'r',
+             verify: bool = False) -> Tuple[Any, Any, Dict[str, Any]]:
+        """Load (model, scaler, metadata), memory-mapped and cached per process"""
+        version_dir = self.resolve(name, version)
+        artifact_path = os.path.join(version_dir, ARTIFACT_FILE)
+
+        cached = _loaded_artifacts.get(artifact_path)
+        if cached is not None:
+            return cached
+
+        metadata = self.get_metadata(name, os.path.basename(version_dir))
+        if verify and self._file_sha256(artifact_path) != metadata['sha256']:
+            raise ValueError(f"Artifact {artifact_path} does not match its recorded sha256")
+
+        artifact = joblib.load(artifact_path, mmap_mode=mmap_mode)
+        loaded = (artifact['model'], artifact['scaler'], metadata)
+        _loaded_artifacts[artifact_path] = loaded
+        return loaded
+
+    def resolve(self, name: str, version: Optional[str] = None) -> str:
+        """Return the directory of a version, defaulting to the latest one"""
+        model_dir = os.path.join(self.root, name)
+        if version is None:
+            try:
+                with open(os.path.join(model_dir, LATEST_FILE)) as f:
+                    version = f.read().strip()
+            except FileNotFoundError:
+                raise ModelNotFoundError(
+                    f"No trained '{name}' model in {self.root}; train and save one before serving"
+                ) from None
+
+        version_dir = os.path.join(model_dir, version)
+        if not os.path.isfile(os.path.join(version_dir, ARTIFACT_FILE)):
+            raise ModelNotFoundError(f"Model '{name}' has no version '{version}' in {self.root}")
+        return version_dir
+
+    def get_metadata(self, name: str, version: Optional[str] = None) -> Dict[str, Any]:
+        """Read the metadata recorded for a version"""
+        with open(os.path.join(self.resolve(name, version), METADATA_FILE)) as f:
+            return json.load(f)
+
+    def list_versions(self, name: str) -> List[Dict[str, Any]]:
+        """List metadata for every saved version, oldest first"""
+        model_dir = os.path.join(self.root, name)
+        if not os.path.isdir(model_dir):
+            return []
+
+        versions = [
+            self.get_metadata(name, entry)
+            for entry in os.listdir(model_dir)
+            if not entry.startswith('.') and os.path.isfile(os.path.join(model_dir, entry, METADATA_FILE))
+        ]
+        return sorted(versions, key=lambda record: record['created_at'])
+
+    def _write_latest(self, model_dir: str, version: str):
+        """Atomically point LATEST at a version"""
+        fd, tmp_path = tempfile.mkstemp(prefix='.latest-', dir=model_dir)
+        with os.fdopen(fd, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(model_dir, LATEST_FILE))
+
+    @staticmethod
+    def _file_sha256(path: str) -> str:
+        """Hash a file in 1MB blocks"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _library_versions() -> Dict[str, str]:
+        """Versions needed to unpickle the artifact safely"""
+        import numpy
+        import sklearn
+        return {'numpy': numpy.__version__, 'scikit-learn': sklearn.__version__, 'joblib': joblib.__version__}
+
+
+if __name__ == "__main__":
+    registry = ModelRegistry()
+    for record in registry.list_versions('risk_model'):
+        print(json.dumps(record, indent=2))
@@ -0,0 +1,624 @@
+"""
+PII Scan Service
+The NER + zero-shot classification + embedding pipeline described in advanced_ai_scanner.py,
+with models loaded once and concurrent requests dynamically batched by padded length
+"""
+
+import json
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+from transformers import (
+    AutoModel,
+    AutoModelForSequenceClassification,
+    AutoModelForTokenClassification,
+    AutoTokenizer
+)
+
+from long_document_ner import EntityStitcher, iter_windows
+
+NER_MODEL = "dslim/bert-base-NER"
+ZERO_SHOT_MODEL = "facebook/bart-large-mnli"
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+SENSITIVE_LABELS = ["medical condition", "financial info", "contact info", "identity"]
+HYPOTHESIS_TEMPLATE = "This example is {}."
+
+# Regex complements for the PII the general-purpose NER model does not tag, most specific
+# first: a span claimed by an earlier pattern is not matched again (a card is not a phone)
+PII_PATTERNS = {
+    "EMAIL": re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+"),
+    "SSN": re.compile(r"(?<!\d)\d{3}-\d{2}-\d{4}(?!\d)"),
+    "CREDIT": re.compile(r"(?<!\d)(?:\d{4}[\s-]?){3}\d{4}(?!\d)"),
+    "PHONE": re.compile(r"(?<!\d)(?:\+?\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)|\d{2,4})[\s.-]?\d{3,4}[\s.-]?\d{4}(?!\d)")
+}
+
+LATENCY_WINDOW = 1024
+_STOP = object()
+
+
+@dataclass
+class ScanModels:
+    """Tokenizers and models for the three stages, in eval mode on one device"""
+
+    ner_tokenizer: Any
+    ner_model: Any
+    zero_shot_tokenizer: Any
+    zero_shot_model: Any
+    embedding_tokenizer: Any
+    embedding_model: Any
+    device: str = "cpu"
+
+    @classmethod
+    def load(cls, ner: str = NER_MODEL, zero_shot: str = ZERO_SHOT_MODEL, embedding: str = EMBEDDING_MODEL,
+             device: str = "cpu", local_files_only: bool = False) -> 'ScanModels':
+        """Load from the Hub cache or local directories; local_files_only never touches the network"""
+        def pretrained(loader, name):
+            return loader.from_pretrained(name, local_files_only=local_files_only)
+
+        models = cls(
+            ner_tokenizer=pretrained(AutoTokenizer, ner),
+            ner_model=pretrained(AutoModelForTokenClassification, ner),
+            zero_shot_tokenizer=pretrained(AutoTokenizer, zero_shot),
+            zero_shot_model=pretrained(AutoModelForSequenceClassification, zero_shot),
+            embedding_tokenizer=pretrained(AutoTokenizer, embedding),
+            embedding_model=pretrained(AutoModel, embedding),
+            device=device
+        )
+        for model in (models.ner_model, models.zero_shot_model, models.embedding_model):
+            model.to(device).eval()
+        return models
+
+
+class StageStats:
+    """Rolling latency windows and padding efficiency for one pipeline stage"""
+
+    def __init__(self):
+        self.items = 0
+        self.batches = 0
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self.queue_wait = deque(maxlen=LATENCY_WINDOW)
+        self.batch_time = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record_batch(self, lengths: Sequence[int], waits: Sequence[float], elapsed: float):
+        with self._lock:
+            self.items += len(lengths)
+            self.batches += 1
+            self.real_tokens += sum(lengths)
+            self.padded_tokens += max(lengths) * len(lengths)
+            self.queue_wait.extend(waits)
+            self.batch_time.append(elapsed)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            summary = {
+                'items': self.items,
+                'batches': self.batches,
+                'mean_batch': round(self.items / self.batches, 1) if self.batches else 0,
+                'padding_efficiency': round(self.real_tokens / self.padded_tokens, 3) if self.padded_tokens else 1.0
+            }
+            for name, window in (('queue_ms', self.queue_wait), ('batch_ms', self.batch_time)):
+                if window:
+                    values = np.array(window) * 1000
+                    summary[name] = {
+                        'p50': round(float(np.percentile(values, 50)), 2),
+                        'p95': round(float(np.percentile(values, 95)), 2),
+                        'max': round(float(values.max()), 2)
+                    }
+        return summary
+
+
+class LengthBucketBatcher:
+    """
+    Collects encoded inputs from concurrent callers for up to max_wait_ms, sorts them by
+    token length and cuts batches of similar length: a batch holds at most max_batch_size
+    rows and max_batch_tokens padded tokens (rows x longest row), and its longest row is
+    at most max_length_ratio times its shortest.
+    """
+
+    def __init__(self, name: str, run_batch: Callable[[List[Dict]], List[Any]],
+                 max_batch_size: int = 32, max_batch_tokens: int = 8192, max_wait_ms: float = 5.0,
+                 max_length_ratio: float = 2.0):
+        self.name = name
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait = max_wait_ms / 1000
+        self.max_length_ratio = max_length_ratio
+        self.stats = StageStats()
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f'{name}-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, encoding: Dict) -> Future:
+        future = Future()
+        self._queue.put((encoding, future, time.perf_counter()))
+        return future
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            pending = [item]
+            deadline = time.monotonic() + self.max_wait
+            # Gather a whole window; bucketing needs more than one full batch to choose from
+            while len(pending) < self.max_batch_size * 4:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                pending.append(item)
+            for batch in self._buckets(pending):
+                self._process(batch)
+
+    def _buckets(self, pending: List[Tuple]) -> List[List[Tuple]]:
+        pending.sort(key=lambda item: len(item[0]['input_ids']))
+        batches, batch, shortest = [], [], 0
+        for item in pending:
+            length = len(item[0]['input_ids'])
+            # Sorted ascending, so this item's length is the new padded width
+            if batch and (len(batch) >= self.max_batch_size or
+                          (len(batch) + 1) * length > self.max_batch_tokens or
+                          length > shortest * self.max_length_ratio):
+                batches.append(batch)
+                batch = []
+            if not batch:
+                shortest = length
+            batch.append(item)
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _process(self, batch: List[Tuple]):
+        live = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not live:
+            return
+        start = time.perf_counter()
+        try:
+            results = self.run_batch([encoding for encoding, _, _ in live])
+        except Exception as error:
+            for _, future, _ in live:
+                future.set_exception(error)
+            return
+        elapsed = time.perf_counter() - start
+        self.stats.record_batch(
+            [len(encoding['input_ids']) for encoding, _, _ in live],
+            [start - submitted for _, _, submitted in live],
+            elapsed
+        )
+        for (_, future, _), result in zip(live, results):
+            future.set_result(result)
+
+
+def collate(encodings: List[Dict], pad_token_id: int, device: str) -> Dict[str, torch.Tensor]:
+    """Right-pad a batch of unpadded encodings to its longest row"""
+    width = max(len(encoding['input_ids']) for encoding in encodings)
+    keys = [key for key in ('input_ids', 'token_type_ids') if key in encodings[0]]
+    tensors = {}
+    for key in keys:
+        pad_value = pad_token_id if key == 'input_ids' else 0
+        rows = np.full((len(encodings), width), pad_value, dtype=np.int64)
+        for row, encoding in enumerate(encodings):
+            rows[row, :len(encoding[key])] = encoding[key]
+        tensors[key] = torch.from_numpy(rows).to(device)
+    mask = np.zeros((len(encodings), width), dtype=np.int64)
+    for row, encoding in enumerate(encodings):
+        mask[row, :len(encoding['input_ids'])] = 1
+    tensors['attention_mask'] = torch.from_numpy(mask).to(device)
+    return tensors
+
+
+def regex_entities(text: str) -> List[Dict[str, Any]]:
+    entities = []
+    for entity_type, pattern in PII_PATTERNS.items():
+        for match in pattern.finditer(text):
+            if any(match.start() < entity['end'] and entity['start'] < match.end() for entity in entities):
+                continue
+            entities.append({'entity_group': entity_type, 'word': match.group(), 'start': match.start(),
+                             'end': match.end(), 'score': 1.0, 'source': 'regex'})
+    return entities
+
+
+def _as_texts(texts: Sequence[str]) -> Sequence[str]:
+    """texts, refusing a bare string, which would otherwise be scanned one character at a time"""
+    if isinstance(texts, str):
+        raise TypeError("texts must be a sequence of strings, not a str; wrap a single text in a list")
+    return texts
+
+
+class PIIScanService:
+    """
+    Runs every text of a scan through NER, zero-shot classification against each
+    sensitive label, and embedding, with one LengthBucketBatcher per stage shared by all
+    concurrent scans. Texts are scored separately rather than joined into one string.
+    NER covers the whole text in overlapping windows of max_length tokens, with at most
+    ner_max_windows of a scan's windows tokenized and queued at a time; the other stages
+    see its first max_length tokens.
+    """
+
+    def __init__(self, models: ScanModels, labels: Sequence[str] = SENSITIVE_LABELS,
+                 leak_texts: Sequence[str] = (), max_length: int = 512, max_batch_size: int = 32,
+                 max_batch_tokens: int = 8192, max_wait_ms: float = 5.0, label_threshold: float = 0.5,
+                 leak_threshold: float = 0.75, ner_stride: int = 128, ner_max_windows: int = 64):
+        self.models = models
+        self.labels = list(labels)
+        self.max_length = max_length
+        self.ner_stride = ner_stride
+        self.ner_max_windows = max(1, ner_max_windows)
+        self.label_threshold = label_threshold
+        self.leak_threshold = leak_threshold
+        self.ner_labels = models.ner_model.config.id2label
+        self.entailment_id = self._entailment_id(models.zero_shot_model.config.label2id)
+        self.scan_latency = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+        batcher_options = dict(max_batch_size=max_batch_size, max_batch_tokens=max_batch_tokens,
+                               max_wait_ms=max_wait_ms)
+        self.stages = {
+            'ner': LengthBucketBatcher('ner', self._run_ner, **batcher_options),
+            'classification': LengthBucketBatcher('classification', self._run_zero_shot, **batcher_options),
+            'embedding': LengthBucketBatcher('embedding', self._run_embedding, **batcher_options)
+        }
+
+        self.leak_texts = list(leak_texts)
+        self.leak_embeddings = (
+            np.stack(self.embed(self.leak_texts)) if self.leak_texts
+            else np.zeros((0, models.embedding_model.config.hidden_size), dtype=np.float32)
+        )
+
+    @staticmethod
+    def _entailment_id(label2id: Dict[str, int]) -> int:
+        for label, label_id in label2id.items():
+            if label.lower().startswith('entail'):
+                return label_id
+        return max(label2id.values())
+
+    def close(self):
+        for stage in self.stages.values():
+            stage.close()
+
+    def _encode(self, tokenizer: Any, text: str, pair: Optional[str] = None) -> Dict:
+        return dict(tokenizer(text, pair, truncation=True, max_length=self.max_length))
+
+    def extract_entities(self, texts: Sequence[str]) -> List[List[Dict[str, Any]]]:
+        """
+        NER entities of each text, stitched across windows in document order. Windows are
+        produced lazily and at most ner_max_windows are in flight, so a scan's memory is
+        bounded by that rather than by document length.
+        """
+        texts = _as_texts(texts)
+        tokenizer = self.models.ner_tokenizer
+        stitchers = [EntityStitcher(text, self.ner_labels) for text in texts]
+        entities: List[List[Dict[str, Any]]] = [[] for _ in texts]
+        in_flight: deque = deque()
+
+        def collect_oldest():
+            index, future = in_flight.popleft()
+            entities[index].extend(stitchers[index].feed(*future.result()))
+
+        for index, text in enumerate(texts):
+            for window in iter_windows(tokenizer, text, self.max_length, self.ner_stride):
+                if len(in_flight) >= self.ner_max_windows:
+                    collect_oldest()
+                in_flight.append((index, self.stages['ner'].submit({'input_ids': window.input_ids, 'window': window})))
+        while in_flight:
+            collect_oldest()
+        for index, stitcher in enumerate(stitchers):
+            entities[index].extend(stitcher.close())
+        return entities
+
+    def classify(self, texts: Sequence[str]) -> List[List[Future]]:
+        texts = _as_texts(texts)
+        tokenizer = self.models.zero_shot_tokenizer
+        return [
+            [
+                self.stages['classification'].submit(self._encode(tokenizer, text, HYPOTHESIS_TEMPLATE.format(label)))
+                for label in self.labels
+            ]
+            for text in texts
+        ]
+
+    def embed(self, texts: Sequence[str]) -> List[np.ndarray]:
+        texts = _as_texts(texts)
+        tokenizer = self.models.embedding_tokenizer
+        futures = [self.stages['embedding'].submit(self._encode(tokenizer, text)) for text in texts]
+        return [future.result() for future in futures]
+
+    def scan(self, texts: Sequence[str], breach_found: bool = False) -> Dict[str, Any]:
+        """
+        Full report for one scan. Classification and embedding are queued first, so they
+        batch while NER streams the texts' windows.
+        """
+        start = time.perf_counter()
+        texts = [text for text in _as_texts(texts) if text and text.strip()]
+        label_futures = self.classify(texts)
+        embedding_futures = [
+            self.stages['embedding'].submit(self._encode(self.models.embedding_tokenizer, text)) for text in texts
+        ]
+
+        pii_entities = []
+        for index, (text, found) in enumerate(zip(texts, self.extract_entities(texts))):
+            # Pattern matches are exact, so they replace any NER span they overlap
+            matched = regex_entities(text)
+            found = [
+                entity for entity in found
+                if not any(entity['start'] < match['end'] and match['start'] < entity['end'] for match in matched)
+            ]
+            pii_entities.extend({**entity, 'text_index': index} for entity in found + matched)
+
+        sensitive_categories = []
+        for index, futures in enumerate(label_futures):
+            # Single-label zero-shot: softmax of the entailment logits across candidate labels
+            logits = np.array([future.result()[self.entailment_id] for future in futures])
+            scores = np.exp(logits - logits.max())
+            scores /= scores.sum()
+            sensitive_categories.append({
+                'text_index': index,
+                'labels': [self.labels[i] for i in np.argsort(-scores)],
+                'scores': [round(float(scores[i]), 4) for i in np.argsort(-scores)]
+            })
+
+        embeddings = np.stack([future.result() for future in embedding_futures]) if texts else None
+        leak_matches = self._leak_matches(embeddings)
+
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.scan_latency.append(elapsed)
+        return {
+            'pii_entities': pii_entities,
+            'sensitive_categories': sensitive_categories,
+            'leak_matches': leak_matches,
+            **self._risk(breach_found, pii_entities, sensitive_categories, leak_matches, len(texts)),
+            'timing_ms': round(elapsed * 1000, 2)
+        }
+
+    def _leak_matches(self, embeddings: Optional[np.ndarray], k: int = 5) -> List[Dict[str, Any]]:
+        """Cosine search of each text against the leak corpus (embeddings are unit length)"""
+        if embeddings is None or not len(self.leak_embeddings):
+            return []
+        similarity = embeddings @ self.leak_embeddings.T
+        matches = []
+        for index, row in enumerate(similarity):
+            for leak in np.argsort(-row)[:k]:
+                if row[leak] >= self.leak_threshold:
+                    matches.append({'text_index': index, 'leak': self.leak_texts[leak],
+                                    'similarity': round(float(row[leak]), 4)})
+        return matches
+
+    def _risk(self, breach_found: bool, pii_entities: List[Dict], sensitive_categories: List[Dict],
+              leak_matches: List[Dict], n_texts: int) -> Dict[str, Any]:
+        """The weighted signal recipe from advanced_ai_scanner.py (step 6)"""
+        pii_types = {entity['entity_group'] for entity in pii_entities}
+        leak_similarity = max((match['similarity'] for match in leak_matches), default=0.0)
+        exposed = sum(categories['scores'][0] >= self.label_threshold for categories in sensitive_categories)
+        public_exposure = exposed / n_texts if n_texts else 0.0
+        risk = (
+            0.4 * bool(breach_found) +
+            0.2 * min(len(pii_types), 5) / 5 +
+            0.25 * leak_similarity +
+            0.15 * public_exposure
+        )
+        risk_score = int(risk * 100)
+        risk_level = 'High' if risk_score >= 70 else 'Medium' if risk_score >= 40 else 'Low'
+        return {'risk_score': risk_score, 'risk_level': risk_level}
+
+    @torch.inference_mode()
+    def _run_ner(self, encodings: List[Dict]) -> List[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(offsets, label ids, scores) of the tokens each window owns"""
+        model = self.models.ner_model
+        logits = model(**collate(encodings, self.models.ner_tokenizer.pad_token_id, self.models.device)).logits
+        probabilities = torch.softmax(logits.float(), dim=-1).cpu().numpy()
+        results = []
+        for encoding, token_probabilities in zip(encodings, probabilities):
+            window = encoding['window']
+            owned = token_probabilities[window.content_start + window.keep_start:window.content_start + window.keep_end]
+            label_ids = owned.argmax(axis=-1)
+            results.append((
+                window.offsets[window.keep_start:window.keep_end],
+                label_ids,
+                owned[np.arange(len(label_ids)), label_ids]
+            ))
+        return results
+
+    @torch.inference_mode()
+    def _run_zero_shot(self, encodings: List[Dict]) -> List[np.ndarray]:
+        model = self.models.zero_shot_model
+        logits = model(**collate(encodings, self.models.zero_shot_tokenizer.pad_token_id, self.models.device)).logits
+        return list(logits.float().cpu().numpy())
+
+    @torch.inference_mode()
+    def _run_embedding(self, encodings: List[Dict]) -> List[np.ndarray]:
+        """Mean pooling over real tokens, L2-normalized (the sentence-transformers recipe)"""
+        model = self.models.embedding_model
+        inputs = collate(encodings, self.models.embedding_tokenizer.pad_token_id, self.models.device)
+        hidden = model(**inputs).last_hidden_state.float()
+        mask = inputs['attention_mask'].unsqueeze(-1).float()
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+        return list(pooled.cpu().numpy())
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            latencies = np.array(self.scan_latency) * 1000
+        scans = {'scans': len(latencies)}
+        if len(latencies):
+            scans['latency_ms'] = {
+                'p50': round(float(np.percentile(latencies, 50)), 2),
+                'p95': round(float(np.percentile(latencies, 95)), 2),
+                'p99': round(float(np.percentile(latencies, 99)), 2)
+            }
+        return {**scans, 'stages': {name: stage.stats.snapshot() for name, stage in self.stages.items()}}
+
+
+class ScanRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /scan  {"text", "texts"?, "breach_found"?}, the body app/api/ai-scan sends
+    GET  /metrics, GET /health
+    """
+
+    service: PIIScanService = None
+    token: Optional[str] = None
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok'})
+        elif self.path == '/metrics':
+            self._send(200, self.service.metrics())
+        else:
+            self._send(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != '/scan':
+            self._send(404, {'error': f"Unknown path {self.path}"})
+            return
+        if self.token and self.headers.get('Authorization') != f"Bearer {self.token}":
+            self._send(401, {'error': "Unauthorized"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            texts = [body.get('text') or '', *body.get('texts', [])]
+            if not all(isinstance(text, str) for text in texts):
+                raise ValueError("'text' and 'texts' must be strings")
+        except (ValueError, AttributeError, TypeError) as error:
+            self._send(400, {'error': f"{type(error).__name__}: {error}"})
+            return
+        try:
+            self._send(200, self.service.scan(texts, breach_found=bool(body.get('breach_found'))))
+        except Exception as error:
+            self._send(500, {'error': f"{type(error).__name__}: {error}"})
+
+    def _send(self, status: int, payload: Any):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request logging is replaced by /metrics
+        pass
+
+
+def make_server(service: PIIScanService, host: str = '127.0.0.1', port: int = 5000,
+                token: Optional[str] = None) -> ThreadingHTTPServer:
+    """HTTP server for a service; token defaults to SCANNER_TOKEN, the AI_SCANNER_TOKEN the routes send"""
+    handler = type('Handler', (ScanRequestHandler,), {
+        'service': service,
+        'token': token if token is not None else os.environ.get('SCANNER_TOKEN')
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def build_tiny_checkpoints(directory: str, ner_labels: Sequence[str] = ("O", "B-PER", "I-PER", "B-LOC", "I-LOC")) -> Dict[str, str]:
+    """
+    Write randomly initialized two-layer BERT checkpoints for the three stages, with a
+    small local WordPiece vocabulary, so the service runs end to end without downloads
+    """
+    from transformers import (
+        BertConfig, BertForSequenceClassification, BertForTokenClassification, BertModel, BertTokenizerFast
+    )
+
+    os.makedirs(directory, exist_ok=True)
+    vocab_path = os.path.join(directory, 'vocab.txt')
+    characters = [chr(code) for code in range(33, 127)]
+    words = "my name is and i live in call me at email the on this example medical financial contact info identity condition".split()
+    with open(vocab_path, 'w') as f:
+        # dict.fromkeys drops repeats ("i" is also a character); a repeated line would get an ID past vocab_size
+        f.write("\n".join(dict.fromkeys(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", *characters,
+                                          *(f"##{character}" for character in characters), *words])))
+    tokenizer = BertTokenizerFast(vocab_path, do_lower_case=False)
+
+    config = dict(vocab_size=tokenizer.vocab_size, hidden_size=32, num_hidden_layers=2,
+                  num_attention_heads=2, intermediate_size=64, max_position_embeddings=512)
+    checkpoints = {
+        'ner': BertForTokenClassification(BertConfig(
+            **config, id2label=dict(enumerate(ner_labels)), label2id={label: i for i, label in enumerate(ner_labels)}
+        )),
+        'zero_shot': BertForSequenceClassification(BertConfig(
+            **config, id2label={0: 'contradiction', 1: 'neutral', 2: 'entailment'},
+            label2id={'contradiction': 0, 'neutral': 1, 'entailment': 2}
+        )),
+        'embedding': BertModel(BertConfig(**config))
+    }
+    paths = {}
+    for name, model in checkpoints.items():
+        paths[name] = os.path.join(directory, name)
+        model.save_pretrained(paths[name])
+        tokenizer.save_pretrained(paths[name])
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    parser = argparse.ArgumentParser(description="Serve the PII scan pipeline over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--ner-model', default=NER_MODEL)
+    parser.add_argument('--zero-shot-model', default=ZERO_SHOT_MODEL)
+    parser.add_argument('--embedding-model', default=EMBEDDING_MODEL)
+    parser.add_argument('--leak-corpus', help="Text file with one leak record per line")
+    parser.add_argument('--max-batch-size', type=int, default=32)
+    parser.add_argument('--max-batch-tokens', type=int, default=8192)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--demo', action='store_true',
+                        help="Run concurrent scans against tiny random checkpoints and print the stage metrics")
+    args = parser.parse_args()
+
+    batching = dict(max_batch_size=args.max_batch_size, max_batch_tokens=args.max_batch_tokens,
+                    max_wait_ms=args.max_wait_ms)
+    if args.demo:
+        paths = build_tiny_checkpoints(tempfile.mkdtemp(prefix='pii-scan-'))
+        models = ScanModels.load(paths['ner'], paths['zero_shot'], paths['embedding'], local_files_only=True)
+        service = PIIScanService(models, leak_texts=["john.doe@example.com | 555-123-4567 | Pune"], **batching)
+        texts = [
+            "My name is John Doe, email john.doe@example.com and phone 555-123-4567. I live in Pune.",
+            "I have been diagnosed with Type 2 Diabetes and taking metformin.",
+            "lorem ipsum " * 300 + "Card 4532-1234-5678-9012 expires soon; SSN 123-45-6789"
+        ]
+        with ThreadPoolExecutor(max_workers=32) as pool:
+            reports = list(pool.map(lambda i: service.scan(texts[i % 3:] + texts[:i % 3]), range(64)))
+        print(json.dumps({key: reports[0][key] for key in ('risk_score', 'risk_level', 'leak_matches')}, indent=2))
+        print(json.dumps([entity for entity in reports[0]['pii_entities'] if entity['source'] == 'regex'], indent=2))
+        print(json.dumps(service.metrics(), indent=2))
+        service.close()
+    else:
+        leak_texts = []
+        if args.leak_corpus:
+            with open(args.leak_corpus) as f:
+                leak_texts = [line.strip() for line in f if line.strip()]
+        models = ScanModels.load(args.ner_model, args.zero_shot_model, args.embedding_model)
+        service = PIIScanService(models, leak_texts=leak_texts, **batching)
+        server = make_server(service, args.host, args.port)
+        print(f"PII scan service on http://{args.host}:{server.server_address[1]}")
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            service.close()
@@ -0,0 +1,125 @@
+"""
+Social Platform Probe Engine
+Deterministic, process-independent account/risk probing for batches of usernames,
+with an LRU + TTL cache keyed by normalized username
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+import numpy as np
+
+NO_ACCOUNT = -1
+RISK_LEVELS = ["Low", "Medium", "High"]
+
+
+def normalize_username(username: str) -> str:
+    """Canonical form used for hashing and cache keys"""
+    return username.strip().lower()
+
+
+def _stable_hash64(values: Sequence[str]) -> np.ndarray:
+    """64-bit BLAKE2b of each string, identical in every process and across restarts"""
+    digests = b''.join(hashlib.blake2b(value.encode(), digest_size=8).digest() for value in values)
+    return np.frombuffer(digests, dtype='<u8').copy()
+
+
+def _mix64(x: np.ndarray) -> np.ndarray:
+    """SplitMix64 finalizer; uint64 arithmetic wraps, which is what we want"""
+    x = x ^ (x >> np.uint64(30))
+    x = x * np.uint64(0xBF58476D1CE4E5B9)
+    x = x ^ (x >> np.uint64(27))
+    x = x * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class LRUTTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, max_size: int = 100_000, ttl: Optional[float] = 3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[1] > self.ttl):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+class PlatformProbe:
+    """
+    Probes every platform for a batch of usernames in one vectorized pass.
+    Each (username, platform) pair gets a stable 64-bit value; a value divisible
+    by 3 means an account exists, and the next base-3 digit picks its risk level.
+    """
+
+    def __init__(self, platforms: List[str], cache: Optional[LRUTTLCache] = None):
+        self.platforms = list(platforms)
+        self.cache = cache if cache is not None else LRUTTLCache()
+        self._platform_salts = _stable_hash64(self.platforms)
+
+    def probe(self, usernames: Sequence[str]) -> np.ndarray:
+        """Risk level codes (index into RISK_LEVELS, or NO_ACCOUNT) of shape (n_usernames, n_platforms)"""
+        keys = [normalize_username(username) for username in usernames]
+        codes = np.empty((len(keys), len(self.platforms)), dtype=np.int8)
+
+        misses = []
+        for row, key in enumerate(keys):
+            cached = self.cache.get(key)
+            if cached is None:
+                misses.append(row)
+            else:
+                codes[row] = cached
+
+        if misses:
+            fresh = self._probe_uncached([keys[row] for row in misses])
+            codes[misses] = fresh
+            for row, fresh_codes in zip(misses, fresh):
+                fresh_codes.flags.writeable = False
+                self.cache.put(keys[row], fresh_codes)
+
+        return codes
+
+    def _probe_uncached(self, keys: List[str]) -> np.ndarray:
+        """Evaluate all platforms for the given normalized usernames"""
+        mixed = _mix64(_stable_hash64(keys)[:, np.newaxis] ^ self._platform_salts[np.newaxis, :])
+        has_account = mixed % np.uint64(3) == 0
+        risk = (mixed // np.uint64(3)) % np.uint64(3)
+        return np.where(has_account, risk.astype(np.int8), np.int8(NO_ACCOUNT))
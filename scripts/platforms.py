@@ -0,0 +1,76 @@
+"""
+Social Platform Registry
+Canonical platform IDs, display names and aliases shared by the analyzer, the
+recommendation engine and the columnar exposure tables
+"""
+
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, TypeVar
+
+V = TypeVar('V')
+
+
+@dataclass(frozen=True)
+class Platform:
+    """One social platform; recommendation is its catalog ID, if it has specific advice"""
+
+    id: str
+    display_name: str
+    aliases: Tuple[str, ...] = ()
+    recommendation: Optional[str] = None
+
+
+# Order is significant: platforms with advice get rule key bits and render in this order
+PLATFORMS: Tuple[Platform, ...] = (
+    Platform('facebook', 'Facebook', ('fb', 'facebook.com'), 'social.platform.facebook'),
+    Platform('instagram', 'Instagram', ('ig', 'insta', 'instagram.com'), 'social.platform.instagram'),
+    Platform('twitter', 'Twitter', ('x', 'x.com', 'twitter.com'), 'social.platform.twitter'),
+    Platform('linkedin', 'LinkedIn', ('linked in', 'linkedin.com'), 'social.platform.linkedin'),
+    Platform('tiktok', 'TikTok', ('tik tok', 'tiktok.com'), 'social.platform.tiktok'),
+    Platform('snapchat', 'Snapchat', ('snap', 'snapchat.com')),
+    Platform('reddit', 'Reddit', ('reddit.com',)),
+    Platform('pinterest', 'Pinterest', ('pinterest.com',))
+)
+
+# Canonical IDs are interned, so every resolved name is the very same string object
+PLATFORM_IDS: Tuple[str, ...] = tuple(sys.intern(platform.id) for platform in PLATFORMS)
+PLATFORMS_BY_ID: Dict[str, Platform] = {platform.id: platform for platform in PLATFORMS}
+
+_canonical: Dict[str, str] = {}
+for _platform_id, _platform in zip(PLATFORM_IDS, PLATFORMS):
+    for _name in (_platform.id, _platform.display_name, *_platform.aliases):
+        _canonical[_name.lower()] = _platform_id
+
+
+def resolve(name: Optional[str]) -> Optional[str]:
+    """Canonical ID for any spelling of a platform ('X', ' Twitter', 'twitter.com'), else None"""
+    if not name:
+        return None
+    return _canonical.get(name.strip().lower())
+
+
+def display_name(platform_id: str) -> str:
+    return PLATFORMS_BY_ID[platform_id].display_name
+
+
+def index_by_spelling(values: Dict[str, V]) -> Dict[str, V]:
+    """
+    values (keyed by canonical ID) re-keyed by every common spelling of each platform:
+    the ID, display name and aliases, each as written, lowercased and uppercased.
+    Per-exposure lookups then hit without normalizing the name; other spellings can
+    fall back to resolve().
+    """
+    spellings: Dict[str, V] = {}
+    for platform_id, platform in zip(PLATFORM_IDS, PLATFORMS):
+        if platform_id not in values:
+            continue
+        for name in (platform.id, platform.display_name, *platform.aliases):
+            for spelling in (name, name.lower(), name.upper(), name.title()):
+                spellings[spelling] = values[platform_id]
+    return spellings
+
+
+if __name__ == "__main__":
+    for name in ['X', 'twitter.com', ' LinkedIn ', 'FB', 'myspace']:
+        print(f"{name!r:>16} -> {resolve(name)}")
@@ -0,0 +1,105 @@
+"""
+Recommendation Catalog
+Every recommendation, educational resource and tip the engines can emit, keyed by a
+stable ID. Engines hand out IDs; the text is serialized once and expanded on demand
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Union
+
+CATALOG: Dict[str, str] = {
+    # RiskAssessmentEngine privacy recommendations
+    'privacy.breach.change_passwords': "Change passwords for all accounts associated with compromised email",
+    'privacy.breach.enable_2fa': "Enable two-factor authentication on all important accounts",
+    'privacy.breach.password_manager': "Consider using a password manager for unique passwords",
+    'privacy.social.tighten_settings': "Review and tighten social media privacy settings",
+    'privacy.social.limit_public_info': "Limit personal information visible to public",
+    'privacy.social.restrict_location': "Remove or restrict location sharing",
+    'privacy.recent.monitor_accounts': "Monitor accounts for suspicious activity",
+    'privacy.recent.account_alerts': "Set up account alerts and notifications",
+    'privacy.recent.credit_monitoring': "Consider credit monitoring services",
+    'privacy.high_risk.remove_sensitive_info': "Remove sensitive personal information from public profiles",
+    'privacy.high_risk.audit_app_permissions': "Audit third-party app permissions",
+    'privacy.high_risk.review_data_sharing': "Review data sharing settings across platforms",
+
+    # AIRecommendationEngine immediate actions
+    'immediate.financial.monitor_accounts': "🚨 URGENT: Monitor all bank and credit card accounts for unauthorized transactions",
+    'immediate.financial.contact_bank': "🚨 Contact your bank immediately to report potential compromise",
+    'immediate.financial.fraud_alerts': "🚨 Place fraud alerts on your credit reports with all three bureaus",
+    'immediate.auth.change_passwords': "🔐 Change passwords on ALL accounts immediately, starting with financial and email",
+    'immediate.auth.enable_2fa': "🔐 Enable two-factor authentication on every account that supports it",
+
+    # Short-term goals
+    'password.install_manager': "Install and set up a password manager (recommended: Bitwarden, 1Password)",
+    'password.unique_passwords': "Generate unique passwords for each of your accounts",
+    'password.update_important_first': "Update your most important accounts first: email, banking, work",
+    'password.consider_manager': "Consider using a password manager for better security",
+    'social.platform.facebook': "Review Facebook privacy settings: limit post visibility, disable facial recognition, check app permissions",
+    'social.platform.instagram': "Make Instagram account private, disable location services, review story settings",
+    'social.platform.twitter': "Protect your Twitter account, review who can find you by email/phone, limit photo tagging",
+    'social.platform.linkedin': "Adjust LinkedIn visibility settings, limit profile information to connections only",
+    'social.platform.tiktok': "Set TikTok account to private, disable location sharing, review data download settings",
+    'social.audit_apps': "Audit and remove third-party apps connected to your social accounts",
+    'social.delete_old_posts': "Review and delete old posts containing personal information",
+    'social.disable_location': "Turn off location sharing across all social media platforms",
+
+    # Long-term improvements
+    'long_term.security_audits': "Set up regular security audits (quarterly review of accounts and passwords)",
+    'long_term.security_notifications': "Enable security notifications on all important accounts",
+    'long_term.vpn': "Consider using a VPN for enhanced privacy protection",
+    'long_term.credit_monitoring': "Regularly monitor your credit reports and identity theft protection services",
+
+    # Educational resources
+    'education.basic.phishing': "Learn about phishing attacks and how to identify them",
+    'education.basic.two_factor': "Understand the basics of two-factor authentication",
+    'education.basic.safe_browsing': "Read about safe browsing practices and public Wi-Fi risks",
+    'education.advanced.privacy_tools': "Advanced privacy tools and techniques",
+    'education.advanced.breach_response': "Understanding data breach notifications and response",
+    'education.advanced.remote_work': "Corporate security best practices for remote work",
+
+    # Educational content
+    'article.breach_guide': "What to Do When Your Data Has Been Breached: A Step-by-Step Guide",
+    'article.credit_monitoring': "Understanding Credit Monitoring and Identity Theft Protection",
+    'article.secure_accounts': "How to Secure Your Accounts After a Data Breach",
+    'tip.change_passwords': "Change passwords starting with your most important accounts",
+    'tip.enable_2fa': "Enable 2FA wherever possible - it blocks 99.9% of automated attacks",
+    'tip.monitor_daily': "Monitor your accounts daily for the next 30 days",
+    'tool.haveibeenpwned': "HaveIBeenPwned - Check for future breaches",
+    'tool.password_managers': "Password Manager Comparison Guide",
+    'tool.two_factor_setup': "Two-Factor Authentication Setup Guides"
+}
+
+# A reference is a catalog ID, or an [ID, params] pair for entries with str.format fields
+Reference = Union[str, Sequence[Any]]
+
+
+@lru_cache(maxsize=None)
+def catalog_json() -> bytes:
+    """The catalog serialized once, for clients to fetch and cache"""
+    return json.dumps(
+        {'version': catalog_version(), 'entries': CATALOG}, ensure_ascii=False, sort_keys=True
+    ).encode()
+
+
+@lru_cache(maxsize=None)
+def catalog_version() -> str:
+    """Content hash of the catalog; changes whenever any entry does"""
+    return hashlib.sha256(json.dumps(CATALOG, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def expand(references: Sequence[Reference]) -> List[str]:
+    """Text form of a sequence of catalog references"""
+    texts = []
+    for reference in references:
+        if isinstance(reference, str):
+            texts.append(CATALOG[reference])
+        else:
+            entry_id, params = reference
+            texts.append(CATALOG[entry_id].format(**params))
+    return texts
+
+
+if __name__ == "__main__":
+    print(catalog_json().decode())
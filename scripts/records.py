@@ -0,0 +1,290 @@
+"""
+Breach and Exposure Records
+Slotted record types for single breaches and social exposures, and columnar
+NumPy tables with categorical codes for scoring long histories or many users at once
+"""
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from platforms import resolve
+from scoring_context import EPOCH_ORDINAL
+
+NO_DATE = np.datetime64('NaT', 'D')
+
+
+class _RecordMapping:
+    """Dict-style read access, so records drop into code written against List[Dict]"""
+
+    __slots__ = ()
+    _aliases: Dict[str, str] = {}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, self._aliases.get(key, key), default)
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, self._aliases.get(key, key))
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, self._aliases.get(key, key))
+
+
+@dataclass(slots=True)
+class BreachRecord(_RecordMapping):
+    """One breach a user appears in"""
+
+    breach_name: str = 'Unknown'
+    severity: str = 'low'
+    data_types: Tuple[str, ...] = ()
+    breach_date: Optional[date] = None
+
+    # DigitalRiskAnalyzer calls the breach name 'site'
+    _aliases = {'site': 'breach_name'}
+
+    @classmethod
+    def from_dict(cls, breach: Dict) -> 'BreachRecord':
+        return cls(
+            breach_name=breach.get('breach_name', breach.get('site', 'Unknown')),
+            severity=breach.get('severity', 'low'),
+            data_types=tuple(breach.get('data_types', ())),
+            breach_date=breach.get('breach_date')
+        )
+
+
+@dataclass(slots=True)
+class ExposureRecord(_RecordMapping):
+    """One social media exposure"""
+
+    platform: str = 'Unknown'
+    exposure_type: str = 'public_profile'
+    risk_level: str = 'low'
+
+    @classmethod
+    def from_dict(cls, exposure: Dict) -> 'ExposureRecord':
+        return cls(
+            platform=exposure.get('platform', 'Unknown'),
+            exposure_type=exposure.get('exposure_type', 'public_profile'),
+            risk_level=exposure.get('risk_level', 'low')
+        )
+
+
+def encode_categories(values: Iterable[str]) -> Tuple[np.ndarray, List[str]]:
+    """Integer codes for a column of labels, with labels numbered in order of first appearance"""
+    lookup: Dict[str, int] = {}
+    codes = np.fromiter((lookup.setdefault(value, len(lookup)) for value in values), dtype=np.int32)
+    return codes, list(lookup)
+
+
+def category_weights(categories: List[str], table: Dict[str, float], default: float) -> np.ndarray:
+    """Weight of every category, indexable by code"""
+    return np.array([table.get(category, default) for category in categories], dtype=np.float64)
+
+
+def index_users(user_ids: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Map record user ids onto positions in user_ids; unknown users are masked out"""
+    if len(user_ids) == 0:
+        return np.zeros(len(values), dtype=np.int64), np.zeros(len(values), dtype=bool)
+    sorter = np.argsort(user_ids, kind='stable')
+    positions = np.minimum(np.searchsorted(user_ids, values, sorter=sorter), len(user_ids) - 1)
+    index = sorter[positions]
+    return index, user_ids[index] == values
+
+
+def _field_values(records: List[Any], name: str, default: Any) -> List[Any]:
+    """One column out of a list of dicts or records"""
+    return [record.get(name, default) for record in records]
+
+
+class BreachTable:
+    """
+    Columnar breaches, optionally for many users (user_id). Severity and data types are
+    categorical codes; each row's data types are the slice
+    data_type_codes[data_type_indptr[i]:data_type_indptr[i + 1]]. Missing dates are NaT.
+    """
+
+    __slots__ = ('breach_name', 'severity', 'severity_categories', 'data_type_indptr',
+                 'data_type_codes', 'data_type_categories', 'breach_date', 'user_id')
+
+    def __init__(self, breach_name: List[str], severity: np.ndarray, severity_categories: List[str],
+                 data_type_indptr: np.ndarray, data_type_codes: np.ndarray, data_type_categories: List[str],
+                 breach_date: np.ndarray, user_id: Optional[np.ndarray] = None):
+        self.breach_name = breach_name
+        self.severity = severity
+        self.severity_categories = severity_categories
+        self.data_type_indptr = data_type_indptr
+        self.data_type_codes = data_type_codes
+        self.data_type_categories = data_type_categories
+        self.breach_date = breach_date
+        self.user_id = user_id
+
+    @classmethod
+    def from_records(cls, records: List[Any], user_ids: Optional[Iterable] = None) -> 'BreachTable':
+        """Build from dicts or BreachRecords; user_ids gives each row's owner"""
+        records = list(records)
+        data_types = _field_values(records, 'data_types', ())
+        counts = np.fromiter(map(len, data_types), dtype=np.int64, count=len(records))
+        severity, severity_categories = encode_categories(_field_values(records, 'severity', 'low'))
+        data_type_codes, data_type_categories = encode_categories(
+            data_type for row in data_types for data_type in row
+        )
+        return cls(
+            breach_name=[
+                record.get('breach_name', record.get('site', 'Unknown')) for record in records
+            ],
+            severity=severity,
+            severity_categories=severity_categories,
+            data_type_indptr=np.concatenate([[0], np.cumsum(counts)]),
+            data_type_codes=data_type_codes,
+            data_type_categories=data_type_categories,
+            breach_date=np.array(
+                [value or NO_DATE for value in _field_values(records, 'breach_date', None)], dtype='datetime64[D]'
+            ),
+            user_id=None if user_ids is None else np.asarray(list(user_ids))
+        )
+
+    def __len__(self):
+        return len(self.severity)
+
+    def __iter__(self) -> Iterator[BreachRecord]:
+        for row in range(len(self)):
+            yield self.record(row)
+
+    def record(self, row: int) -> BreachRecord:
+        """Row as a BreachRecord"""
+        breach_date = self.breach_date[row]
+        return BreachRecord(
+            breach_name=self.breach_name[row],
+            severity=self.severity_categories[self.severity[row]],
+            data_types=tuple(self.row_data_types(row)),
+            breach_date=None if np.isnat(breach_date) else breach_date.item()
+        )
+
+    def row_data_types(self, row: int) -> List[str]:
+        codes = self.data_type_codes[self.data_type_indptr[row]:self.data_type_indptr[row + 1]]
+        return [self.data_type_categories[code] for code in codes]
+
+    def data_type_lists(self) -> List[List[str]]:
+        """Every row's data type names"""
+        names = np.array(self.data_type_categories, dtype=object)[self.data_type_codes].tolist()
+        bounds = self.data_type_indptr.tolist()
+        return [names[start:end] for start, end in zip(bounds, bounds[1:])]
+
+    def severity_weights(self, table: Dict[str, float], default: float) -> np.ndarray:
+        """Per-row severity weight"""
+        return category_weights(self.severity_categories, table, default)[self.severity]
+
+    def data_type_weights(self, table: Dict[str, float], default: float) -> np.ndarray:
+        """Per-row sum of data type weights"""
+        counts = np.diff(self.data_type_indptr)
+        return np.bincount(
+            np.repeat(np.arange(len(self)), counts),
+            weights=category_weights(self.data_type_categories, table, default)[self.data_type_codes],
+            minlength=len(self)
+        )
+
+    def data_type_flags(self, flags: Dict[str, int]) -> np.ndarray:
+        """Per-row bitwise OR of the flags of its data types"""
+        code_flags = np.array([flags.get(category, 0) for category in self.data_type_categories], dtype=np.int64)
+        row_flags = np.zeros(len(self), dtype=np.int64)
+        rows = np.repeat(np.arange(len(self)), np.diff(self.data_type_indptr))
+        np.bitwise_or.at(row_flags, rows, code_flags[self.data_type_codes])
+        return row_flags
+
+    def date_ordinals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(has_date, proleptic ordinal day) per row; rows without a date get ordinal 0"""
+        has_date = ~np.isnat(self.breach_date)
+        ordinals = self.breach_date.astype(np.int64) + EPOCH_ORDINAL
+        return has_date, np.where(has_date, ordinals, 0)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.severity, self.data_type_indptr, self.data_type_codes, self.breach_date]
+        if self.user_id is not None:
+            arrays.append(self.user_id)
+        return sum(array.nbytes for array in arrays)
+
+
+class ExposureTable:
+    """Columnar social exposures, optionally for many users (user_id), with categorical columns"""
+
+    __slots__ = ('platform', 'platform_categories', 'exposure_type', 'exposure_type_categories',
+                 'risk_level', 'risk_level_categories', 'user_id')
+
+    def __init__(self, platform: np.ndarray, platform_categories: List[str],
+                 exposure_type: np.ndarray, exposure_type_categories: List[str],
+                 risk_level: np.ndarray, risk_level_categories: List[str],
+                 user_id: Optional[np.ndarray] = None):
+        self.platform = platform
+        self.platform_categories = platform_categories
+        self.exposure_type = exposure_type
+        self.exposure_type_categories = exposure_type_categories
+        self.risk_level = risk_level
+        self.risk_level_categories = risk_level_categories
+        self.user_id = user_id
+
+    @classmethod
+    def from_records(cls, records: List[Any], user_ids: Optional[Iterable] = None) -> 'ExposureTable':
+        """Build from dicts or ExposureRecords; user_ids gives each row's owner"""
+        records = list(records)
+        platform, platform_categories = encode_categories(_field_values(records, 'platform', 'Unknown'))
+        exposure_type, exposure_type_categories = encode_categories(
+            _field_values(records, 'exposure_type', 'public_profile')
+        )
+        risk_level, risk_level_categories = encode_categories(_field_values(records, 'risk_level', 'low'))
+        return cls(
+            platform=platform,
+            platform_categories=platform_categories,
+            exposure_type=exposure_type,
+            exposure_type_categories=exposure_type_categories,
+            risk_level=risk_level,
+            risk_level_categories=risk_level_categories,
+            user_id=None if user_ids is None else np.asarray(list(user_ids))
+        )
+
+    def __len__(self):
+        return len(self.risk_level)
+
+    def __iter__(self) -> Iterator[ExposureRecord]:
+        for row in range(len(self)):
+            yield self.record(row)
+
+    def record(self, row: int) -> ExposureRecord:
+        """Row as an ExposureRecord"""
+        return ExposureRecord(
+            platform=self.platform_categories[self.platform[row]],
+            exposure_type=self.exposure_type_categories[self.exposure_type[row]],
+            risk_level=self.risk_level_categories[self.risk_level[row]]
+        )
+
+    def exposure_type_weights(self, table: Dict[str, float], default: float) -> np.ndarray:
+        return category_weights(self.exposure_type_categories, table, default)[self.exposure_type]
+
+    def risk_level_weights(self, table: Dict[str, float], default: float) -> np.ndarray:
+        return category_weights(self.risk_level_categories, table, default)[self.risk_level]
+
+    def platform_flags(self, flags: Dict[str, int]) -> np.ndarray:
+        """Per-row flag of each platform; flags is keyed by canonical platform ID"""
+        code_flags = np.array(
+            [flags.get(resolve(category), 0) for category in self.platform_categories], dtype=np.int64
+        )
+        return code_flags[self.platform]
+
+    def risk_level_is(self, level: str) -> np.ndarray:
+        """Per-row mask of exposures at a given risk level"""
+        if level not in self.risk_level_categories:
+            return np.zeros(len(self), dtype=bool)
+        return self.risk_level == self.risk_level_categories.index(level)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.platform, self.exposure_type, self.risk_level]
+        if self.user_id is not None:
+            arrays.append(self.user_id)
+        return sum(array.nbytes for array in arrays)
+
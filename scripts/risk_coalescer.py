@@ -0,0 +1,161 @@
+"""
+Risk Score Coalescer
+Micro-batches concurrent single-user DigitalRiskAnalyzer scoring calls into one
+scaler.transform and predict, then hands each caller its own result
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ai_risk_model import DigitalRiskAnalyzer
+
+_STOP = object()
+
+
+class RiskScoreCoalescer:
+    """
+    Callers keep gathering their own sources and building their own reports; only the
+    model call is shared. A batch is cut when max_batch_size requests are waiting or
+    max_wait_ms has passed since the first one arrived, whichever comes first, so a
+    lone request waits at most max_wait_ms.
+    """
+
+    def __init__(self, analyzer: Optional[DigitalRiskAnalyzer] = None,
+                 max_batch_size: int = 256, max_wait_ms: float = 2.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.analyzer = analyzer or DigitalRiskAnalyzer()
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = {'requests': 0, 'batches': 0, 'largest_batch': 0}
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        # Orders submit() against close(), so nothing can be queued behind the stop marker
+        self._lock = threading.Lock()
+
+    def start(self) -> 'RiskScoreCoalescer':
+        """Load the model and start the batching thread (also done on first use); reopens after close()"""
+        with self._lock:
+            self._closed = False
+            self._start_locked()
+        return self
+
+    def _start_locked(self):
+        if self._thread is None:
+            if not self.analyzer.risk_model:
+                self.analyzer.load_model()
+            self._thread = threading.Thread(target=self._run, name='risk-coalescer', daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Score whatever is queued, then stop the batching thread; later submit() calls raise"""
+        with self._lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+        # Nothing should be left, but a caller must never wait on a future no thread will resolve
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("RiskScoreCoalescer is closed"))
+
+    def __enter__(self) -> 'RiskScoreCoalescer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, features: Sequence[float]) -> Future:
+        """Queue one feature row; the future resolves to its predicted risk score"""
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("RiskScoreCoalescer is closed")
+            self._start_locked()
+            self._queue.put((features, future))
+        return future
+
+    def calculate_risk_score(self, email: str, phone: Optional[str] = None) -> Dict[str, Any]:
+        """Coalesced DigitalRiskAnalyzer.calculate_risk_score"""
+        sources = self.analyzer.gather_sources(email, phone)
+        return self._report(self.submit(self.analyzer.extract_features(*sources)).result(), sources)
+
+    def score_findings(self, breaches: List, social_exposures: List, dark_web_mentions: Sequence = ()) -> Dict[str, Any]:
+        """Coalesced DigitalRiskAnalyzer.score_findings"""
+        sources = (breaches, social_exposures, dark_web_mentions)
+        return self._report(self.submit(self.analyzer.extract_features(*sources)).result(), sources)
+
+    async def calculate_risk_score_async(self, email: str, phone: Optional[str] = None) -> Dict[str, Any]:
+        """calculate_risk_score for asyncio callers; the event loop is never blocked on the model"""
+        sources = await asyncio.to_thread(self.analyzer.gather_sources, email, phone)
+        risk_score = await asyncio.wrap_future(self.submit(self.analyzer.extract_features(*sources)))
+        return self._report(risk_score, sources)
+
+    def _report(self, risk_score: float, sources: Tuple) -> Dict[str, Any]:
+        return self.analyzer.build_report(risk_score, *sources)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._score_batch(batch)
+
+    def _score_batch(self, batch: List[Tuple[Sequence[float], Future]]):
+        self.stats['requests'] += len(batch)
+        self.stats['batches'] += 1
+        self.stats['largest_batch'] = max(self.stats['largest_batch'], len(batch))
+        # Callers that cancelled while queued drop out of the batch
+        live = [(features, future) for features, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        futures = [future for _, future in live]
+        try:
+            features = np.array([features for features, _ in live], dtype=np.float64)
+            risk_scores = self.analyzer.risk_model.predict(self.analyzer.scaler.transform(features))
+        except Exception as error:
+            for future in futures:
+                future.set_exception(error)
+            return
+        for future, risk_score in zip(futures, risk_scores.tolist()):
+            future.set_result(risk_score)
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    emails = [f"user{i}@example.com" for i in range(2000)]
+    with RiskScoreCoalescer(max_batch_size=256, max_wait_ms=2.0) as coalescer:
+        with ThreadPoolExecutor(max_workers=64) as pool:
+            start = time.perf_counter()
+            reports = list(pool.map(coalescer.calculate_risk_score, emails))
+            elapsed = time.perf_counter() - start
+    print(f"{len(reports)} reports in {elapsed:.2f}s over {coalescer.stats['batches']} model calls "
+          f"(largest batch {coalescer.stats['largest_batch']})")
+    print("First:", reports[0]['risk_score'], reports[0]['risk_level'])
@@ -0,0 +1,200 @@
+"""
+Scoring Result Cache
+Memoizes RiskAssessmentEngine.calculate_overall_risk and AIRecommendationEngine.analyze_user_risk_profile
+under a content hash of their normalized inputs, engine version and recency buckets
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ai_recommendation_engine import AIRecommendationEngine, rule_table_version
+from platform_probe import LRUTTLCache
+from recommendation_catalog import catalog_version
+from risk_assessment import RiskAssessmentEngine
+from scoring_context import ScoringContext, resolve_context
+
+
+def canonical_hash(value: Any) -> str:
+    """SHA-256 of the canonical JSON form of a normalized value"""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class SQLiteCacheBackend:
+    """
+    Shared-cache stand-in backed by a local SQLite file (or ':memory:'). Any object with
+    the same get(key) -> Optional[bytes] / put(key, value) methods can replace it.
+    """
+
+    def __init__(self, path: str = ':memory:', ttl: Optional[float] = None):
+        self.ttl = ttl
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS scoring_cache (key TEXT PRIMARY KEY, value BLOB, stored_at REAL)"
+        )
+        self._connection.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, stored_at FROM scoring_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            return None
+        return row[0]
+
+    def put(self, key: str, value: bytes):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO scoring_cache (key, value, stored_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            self._connection.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM scoring_cache")
+            self._connection.commit()
+
+
+class CachedScorer:
+    """
+    Read-through cache in front of the scoring engines: a bounded in-process LRU,
+    then an optional shared backend, then the engine itself.
+
+    Keys hash the inputs reduced to what the result depends on. Breach dates enter
+    only as their recency bucket, so a cached score stays valid across days until
+    one of the user's breaches ages into another bucket.
+    """
+
+    def __init__(self, risk_engine: Optional[RiskAssessmentEngine] = None,
+                 recommendation_engine: Optional[AIRecommendationEngine] = None,
+                 local_cache: Optional[LRUTTLCache] = None, backend: Any = None):
+        self.risk_engine = risk_engine or RiskAssessmentEngine()
+        self.recommendation_engine = recommendation_engine or AIRecommendationEngine()
+        self.local_cache = local_cache if local_cache is not None else LRUTTLCache(max_size=100_000, ttl=None)
+        self.backend = backend
+        self.metrics = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+        self._metrics_lock = threading.Lock()
+
+        # Engine versions are part of every key, so results from other weights, rules,
+        # catalog text or output form (catalog IDs vs expanded text) never match
+        self.recommendation_version = canonical_hash([
+            self.recommendation_engine.sensitivity_categories,
+            rule_table_version(),
+            catalog_version(),
+            self.recommendation_engine.expand_recommendations
+        ])[:12]
+
+    @property
+    def risk_version(self) -> str:
+        # Follows hot reloads of the engine's weight set; catalog IDs and expanded text never share an entry
+        return canonical_hash([
+            self.risk_engine.weights.fingerprint,
+            catalog_version(),
+            self.risk_engine.expand_recommendations
+        ])[:12]
+
+    def calculate_overall_risk(self, breach_data: List[Dict], social_exposures: List[Dict],
+                               context: Optional[ScoringContext] = None) -> Dict[str, Any]:
+        """Cached RiskAssessmentEngine.calculate_overall_risk"""
+        context = resolve_context(context)
+        key = canonical_hash([
+            'calculate_overall_risk',
+            self.risk_version,
+            [
+                [
+                    breach.get('breach_name', 'Unknown'),
+                    breach.get('severity', 'low'),
+                    list(breach.get('data_types', [])),
+                    context.recency_bucket(breach['breach_date']) if breach.get('breach_date') else None
+                ]
+                for breach in breach_data
+            ],
+            [
+                [
+                    exposure.get('platform', 'Unknown'),
+                    exposure.get('exposure_type', 'public_profile'),
+                    exposure.get('risk_level', 'low')
+                ]
+                for exposure in social_exposures
+            ]
+        ])
+        return self._get_or_compute(
+            key, lambda: self.risk_engine.calculate_overall_risk(breach_data, social_exposures, context)
+        )
+
+    def analyze_user_risk_profile(self, breach_data: List[Dict], social_data: List[Dict],
+                                  user_behavior: Dict = None) -> Dict[str, Any]:
+        """Cached AIRecommendationEngine.analyze_user_risk_profile"""
+        key = canonical_hash([
+            'analyze_user_risk_profile',
+            self.recommendation_version,
+            [[breach.get('severity', 'low'), list(breach.get('data_types', []))] for breach in breach_data],
+            [exposure.get('risk_level', 'low') for exposure in social_data],
+            user_behavior or {}
+        ])
+        return self._get_or_compute(
+            key, lambda: self.recommendation_engine.analyze_user_risk_profile(breach_data, social_data, user_behavior)
+        )
+
+    def _get_or_compute(self, key: str, compute) -> Dict[str, Any]:
+        """Return the cached result for key, or compute and store it in both tiers"""
+        # Results are stored serialized so callers can never mutate a cached copy
+        encoded = self.local_cache.get(key)
+        if encoded is not None:
+            self._count('local_hits')
+            return json.loads(encoded)
+
+        if self.backend is not None:
+            encoded = self.backend.get(key)
+            if encoded is not None:
+                self._count('shared_hits')
+                self.local_cache.put(key, encoded)
+                return json.loads(encoded)
+
+        self._count('misses')
+        encoded = json.dumps(compute(), default=str).encode()
+        self.local_cache.put(key, encoded)
+        if self.backend is not None:
+            self.backend.put(key, encoded)
+        # Decoded like a hit, so both paths return the same types (lists, not tuples)
+        return json.loads(encoded)
+
+    def _count(self, metric: str):
+        with self._metrics_lock:
+            self.metrics[metric] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counts per tier and the overall hit rate"""
+        with self._metrics_lock:
+            metrics = dict(self.metrics)
+        total = sum(metrics.values())
+        metrics['hit_rate'] = (metrics['local_hits'] + metrics['shared_hits']) / total if total else 0.0
+        metrics['local_size'] = len(self.local_cache)
+        return metrics
+
+
+if __name__ == "__main__":
+    from datetime import datetime
+
+    scorer = CachedScorer(backend=SQLiteCacheBackend())
+    breaches = [{
+        'breach_name': 'LinkedIn', 'severity': 'high',
+        'data_types': ['email', 'password'], 'breach_date': datetime(2021, 6, 1).date()
+    }]
+    exposures = [{'platform': 'Twitter', 'exposure_type': 'public_profile', 'risk_level': 'medium'}]
+
+    for _ in range(3):
+        scorer.calculate_overall_risk(breaches, exposures)
+        scorer.analyze_user_risk_profile(breaches, exposures)
+
+    # A second process sharing the backend starts with an empty LRU but still skips scoring
+    replica = CachedScorer(backend=scorer.backend)
+    print(json.dumps(replica.calculate_overall_risk(breaches, exposures)['overall_score']))
+    print(json.dumps(scorer.stats()), json.dumps(replica.stats()))
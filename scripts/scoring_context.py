@@ -0,0 +1,50 @@
+"""
+Scoring Context
+Fixes the reference date once per scoring run and buckets breach dates by recency
+against precomputed 30/90/365-day cutoffs
+"""
+
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Recency buckets, newest first, with the largest age (in days) each one covers
+RECENCY_BUCKETS = ['days_30', 'days_90', 'days_365', 'older']
+RECENCY_LIMITS = [30, 90, 365]
+
+# datetime64[D] counts days from 1970-01-01; date.toordinal counts from 0001-01-01
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class ScoringContext:
+    """
+    Reference date shared by every record scored in one call or batch, so a batch
+    that runs across midnight still scores every breach against the same day
+    """
+
+    def __init__(self, reference_date: Optional[date] = None):
+        self.reference_date = reference_date or datetime.now().date()
+        self.today = self.reference_date.toordinal()
+        # Oldest ordinal day still inside each bucket, ascending: days_365, days_90, days_30
+        self.cutoffs = [self.today - limit for limit in reversed(RECENCY_LIMITS)]
+        self._cutoff_array = np.array(self.cutoffs, dtype=np.int64)
+
+    def days_since(self, value: date) -> int:
+        return self.today - value.toordinal()
+
+    def recency_bucket(self, value: date) -> int:
+        """Index into RECENCY_BUCKETS for one breach date"""
+        return len(self.cutoffs) - bisect_right(self.cutoffs, value.toordinal())
+
+    def recency_buckets(self, ordinals: Sequence[int]) -> np.ndarray:
+        """Vectorized recency_bucket over ordinal days"""
+        return len(self.cutoffs) - np.searchsorted(self._cutoff_array, np.asarray(ordinals, dtype=np.int64), side='right')
+
+
+def resolve_context(context: Optional[ScoringContext] = None, reference_date: Optional[date] = None) -> ScoringContext:
+    """The given context, or a fresh one for reference_date (default today)"""
+    if context is not None:
+        return context
+    return ScoringContext(reference_date)
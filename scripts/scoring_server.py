@@ -0,0 +1,355 @@
+"""
+Scoring Server
+Long-lived HTTP service that loads the Python engines once and spreads batch scoring
+across a pre-forked process pool sharing them copy-on-write
+"""
+
+import gc
+import json
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from ai_recommendation_engine import AIRecommendationEngine
+from ai_risk_model import DigitalRiskAnalyzer
+from model_registry import ModelNotFoundError
+from risk_assessment import RiskAssessmentEngine
+from scoring_context import ScoringContext
+
+# Engines are loaded in the parent before the pool forks; workers inherit them copy-on-write
+_engines: Dict[str, Any] = {}
+
+LATENCY_WINDOW = 1024
+
+
+def load_engines(analyzer: Optional[DigitalRiskAnalyzer] = None) -> Dict[str, Any]:
+    """Build every engine once; the analyzer is None when no trained model is registered"""
+    analyzer = analyzer or DigitalRiskAnalyzer()
+    try:
+        analyzer.load_model()
+    except ModelNotFoundError:
+        analyzer = None
+    return {
+        'risk': RiskAssessmentEngine(),
+        'recommendation': AIRecommendationEngine(),
+        'analyzer': analyzer
+    }
+
+
+def _parse_breaches(breaches: List[Dict]) -> List[Dict]:
+    """JSON breaches with their ISO breach_date strings turned back into dates"""
+    parsed = []
+    for breach in breaches:
+        breach_date = breach.get('breach_date')
+        if isinstance(breach_date, str):
+            breach = {**breach, 'breach_date': date.fromisoformat(breach_date[:10]) if breach_date else None}
+        parsed.append(breach)
+    return parsed
+
+
+def _assess_risk(users: List[Dict], options: Dict) -> List[Dict]:
+    context = ScoringContext(date.fromisoformat(options['reference_date']))
+    risk = _engines['risk']
+    return [
+        risk.calculate_overall_risk(
+            _parse_breaches(user.get('breaches', [])), user.get('social_exposures', []), context
+        )
+        for user in users
+    ]
+
+
+def _recommendations(users: List[Dict], options: Dict) -> List[Dict]:
+    return _engines['recommendation'].generate_personalized_recommendations_batch(
+        [_parse_breaches(user.get('breach_data', [])) for user in users],
+        [user.get('social_data', []) for user in users],
+        [user.get('user_behavior') or {} for user in users]
+    )
+
+
+def _analyze_risk(users: List[Dict], options: Dict) -> List[Dict]:
+    # The pool already spreads chunks across cores; keep the forest single-threaded per worker
+    return _engines['analyzer'].calculate_risk_scores(
+        [user['email'] for user in users], [user.get('phone') for user in users], n_jobs=1
+    )
+
+
+# Batch endpoint -> (worker function, engine it needs)
+ENDPOINTS: Dict[str, tuple] = {
+    '/assess-risk/batch': (_assess_risk, 'risk'),
+    '/recommendations/batch': (_recommendations, 'recommendation'),
+    '/analyze-risk/batch': (_analyze_risk, 'analyzer')
+}
+
+
+def _run_chunk(path: str, users: List[Dict], options: Dict) -> List[Dict]:
+    """Executed in a pool worker against the inherited engines"""
+    return ENDPOINTS[path][0](users, options)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class EndpointStats:
+    """Request, error and item counts plus a rolling latency window for one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.items = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = np.array(self.latencies) * 1000
+        summary = {'requests': self.requests, 'errors': self.errors, 'items': self.items}
+        if len(latencies):
+            summary['latency_ms'] = {
+                'mean': round(float(latencies.mean()), 2),
+                'p50': round(float(np.percentile(latencies, 50)), 2),
+                'p95': round(float(np.percentile(latencies, 95)), 2),
+                'p99': round(float(np.percentile(latencies, 99)), 2)
+            }
+        return summary
+
+
+class ScoringServer:
+    """
+    Threaded HTTP front end over a fork-based multiprocessing pool. Each batch request
+    is cut into chunks of chunk_size users that the workers score in parallel.
+    Requires the fork start method (Linux, macOS).
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765, workers: Optional[int] = None,
+                 chunk_size: int = 64, timeout: float = 30.0, token: Optional[str] = None,
+                 analyzer: Optional[DigitalRiskAnalyzer] = None):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        # Same bearer token the Next.js routes send as AI_SCANNER_TOKEN; None disables the check
+        self.token = token if token is not None else os.environ.get('SCORING_SERVER_TOKEN')
+        self.analyzer = analyzer
+        self.pool = None
+        self.httpd = None
+        self.started_at = None
+        self.stats: Dict[str, EndpointStats] = {}
+        self._pending_chunks = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> 'ScoringServer':
+        """Load the engines, fork the workers and bind the socket"""
+        global _engines
+        _engines = load_engines(self.analyzer)
+        # Move everything loaded so far out of the collector's view, so GC passes in the
+        # workers do not write to (and un-share) the inherited pages
+        gc.collect()
+        gc.freeze()
+        self.pool = multiprocessing.get_context('fork').Pool(self.workers)
+        self.httpd = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self.port = self.httpd.server_address[1]
+        self.started_at = time.time()
+        return self
+
+    def serve_forever(self):
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        if self.httpd is not None:
+            self.httpd.server_close()
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+        gc.unfreeze()
+
+    def available(self, path: str) -> bool:
+        return _engines.get(ENDPOINTS[path][1]) is not None
+
+    def score(self, path: str, users: List[Dict], options: Dict) -> List[Dict]:
+        """Score a batch on the pool, preserving input order"""
+        chunks = [users[start:start + self.chunk_size] for start in range(0, len(users), self.chunk_size)]
+        with self._lock:
+            self._pending_chunks += len(chunks)
+        pending = [
+            self.pool.apply_async(
+                _run_chunk, (path, chunk, options), callback=self._chunk_done, error_callback=self._chunk_done
+            )
+            for chunk in chunks
+        ]
+        deadline = time.monotonic() + self.timeout
+        results = []
+        for result in pending:
+            results.extend(result.get(max(0.0, deadline - time.monotonic())))
+        return results
+
+    def _chunk_done(self, _):
+        with self._lock:
+            self._pending_chunks -= 1
+
+    def record(self, path: str, elapsed: float, items: int, failed: bool):
+        with self._lock:
+            stats = self.stats.setdefault(path, EndpointStats())
+            stats.requests += 1
+            stats.errors += failed
+            stats.items += items
+            stats.latencies.append(elapsed)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queue_depth': self._pending_chunks,
+                'uptime_s': round(time.time() - self.started_at, 1),
+                'endpoints': {path: stats.snapshot() for path, stats in self.stats.items()}
+            }
+
+    def _handler_class(self) -> Callable:
+        server = self
+
+        class Handler(ScoringRequestHandler):
+            scoring_server = server
+
+        return Handler
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /assess-risk/batch      {"users": [{"breaches", "social_exposures"}], "reference_date"?}
+    POST /recommendations/batch  {"users": [{"breach_data", "social_data", "user_behavior"?}]}
+    POST /analyze-risk/batch     {"users": [{"email", "phone"?}]}
+    POST /analyze-risk           {"email", "phone"?}, as called by app/api/ai-risk-analysis
+    GET  /health, GET /metrics
+    """
+
+    scoring_server: ScoringServer = None
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path == '/health':
+            self._send(200, {'status': 'ok', 'engines': {name: engine is not None for name, engine in _engines.items()}})
+        elif self.path == '/metrics':
+            self._send(200, self.scoring_server.metrics())
+        else:
+            self._send(404, {'error': f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        server = self.scoring_server
+        single = self.path == '/analyze-risk'
+        path = '/analyze-risk/batch' if single else self.path
+        if path not in ENDPOINTS:
+            self._send(404, {'error': f"Unknown path {self.path}"})
+            return
+        if server.token and self.headers.get('Authorization') != f"Bearer {server.token}":
+            self._send(401, {'error': "Unauthorized"})
+            return
+
+        start = time.perf_counter()
+        users = []
+        failed = True
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            users = [body] if single else body.get('users')
+            if not isinstance(users, list):
+                self._send(400, {'error': "Body needs a 'users' list"})
+                return
+            if not server.available(path):
+                self._send(503, {'error': "No trained risk model is registered; train one before serving"})
+                return
+
+            options = {'reference_date': body.get('reference_date') or datetime.now().date().isoformat()}
+            results = server.score(path, users, options)
+            self._send(200, results[0] if single else {'results': results})
+            failed = False
+        except multiprocessing.TimeoutError:
+            self._send(504, {'error': f"Scoring did not finish within {server.timeout}s"})
+        except (ValueError, KeyError, TypeError, AttributeError) as error:
+            self._send(400, {'error': f"{type(error).__name__}: {error}"})
+        except Exception as error:
+            self._send(500, {'error': f"{type(error).__name__}: {error}"})
+        finally:
+            server.record(path, time.perf_counter() - start, len(users or []), failed)
+
+    def _send(self, status: int, payload: Any):
+        body = json.dumps(payload, default=_json_default).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request logging is replaced by /metrics
+        pass
+
+
+if __name__ == "__main__":
+    import argparse
+    import urllib.request
+
+    parser = argparse.ArgumentParser(description="Serve the scoring engines over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help="Pool processes (default: one per CPU)")
+    parser.add_argument('--chunk-size', type=int, default=64, help="Users per pool task")
+    parser.add_argument('--timeout', type=float, default=30.0, help="Seconds before a batch returns 504")
+    parser.add_argument('--demo', action='store_true', help="Start on a free port, send a sample batch and exit")
+    args = parser.parse_args()
+
+    server = ScoringServer(
+        args.host, 0 if args.demo else args.port, args.workers, args.chunk_size, args.timeout
+    ).start()
+    if not args.demo:
+        print(f"Scoring server on http://{server.host}:{server.port} with {server.workers} workers")
+        server.serve_forever()
+    else:
+        threading.Thread(target=server.httpd.serve_forever, daemon=True).start()
+        base_url = f"http://{server.host}:{server.port}"
+
+        def post(path, payload):
+            request = urllib.request.Request(
+                base_url + path, data=json.dumps(payload).encode(), headers={'Content-Type': 'application/json'}
+            )
+            with urllib.request.urlopen(request) as response:
+                return json.load(response)
+
+        users = [
+            {
+                'breaches': [{
+                    'breach_name': 'LinkedIn', 'severity': 'high',
+                    'data_types': ['email', 'password'], 'breach_date': '2021-06-01'
+                }] * (i % 4),
+                'social_exposures': [{'platform': 'Twitter', 'exposure_type': 'location_data', 'risk_level': 'high'}]
+            }
+            for i in range(500)
+        ]
+        scores = post('/assess-risk/batch', {'users': users})['results']
+        print("Scored", len(scores), "users; first:", scores[1]['overall_score'], scores[1]['risk_level'])
+        recommendations = post('/recommendations/batch', {'users': [
+            {'breach_data': user['breaches'], 'social_data': user['social_exposures']} for user in users[:8]
+        ]})['results']
+        print("Recommendations for", len(recommendations), "users")
+        if _engines['analyzer'] is not None:
+            print("Risk model score:", post('/analyze-risk', {'email': 'test@example.com'})['risk_score'])
+        with urllib.request.urlopen(base_url + '/metrics') as response:
+            print(json.dumps(json.load(response), indent=2))
+        server.httpd.shutdown()
+        server.close()
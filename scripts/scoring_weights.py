@@ -0,0 +1,198 @@
+"""
+Scoring Weights
+Risk scoring weights loaded from a versioned JSON config into frozen lookup tables,
+shared by every engine in the process and swappable at runtime
+"""
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+from scoring_context import RECENCY_BUCKETS
+
+# Config lives next to the scripts unless overridden, so the working directory never matters
+DEFAULT_WEIGHTS_PATH = os.environ.get(
+    'RISK_WEIGHTS_CONFIG',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'scoring_weights.json')
+)
+
+WEIGHT_TABLES = ('breach_severity', 'data_types', 'social_exposure', 'risk_level_multiplier')
+
+# Process-wide cache keyed by (path, mtime, size), so every engine shares one loaded copy
+_loaded_weights: Dict[Tuple[str, int, int], 'ScoringWeights'] = {}
+_current: Optional['ScoringWeights'] = None
+_lock = threading.Lock()
+
+
+class _DefaultWeights(dict):
+    """label -> weight dict that answers unknown labels with a default, at dict speed for known ones"""
+
+    __slots__ = ('default',)
+
+    def __init__(self, weights: Mapping[str, float], default: float):
+        super().__init__(weights)
+        self.default = default
+
+    def __missing__(self, label: str) -> float:
+        return self.default
+
+
+class WeightTable(Mapping):
+    """
+    Read-only label -> weight mapping with a default for unknown labels. Each label
+    has an integer code; values[code] is its weight and values[-1] the default.
+    Per-record loops should index weight_of[label], which never raises.
+    """
+
+    __slots__ = ('labels', 'default', 'values', 'weight_of', '_index', '_weights')
+
+    def __init__(self, weights: Mapping[str, float], default: float):
+        self.labels = tuple(weights)
+        self.default = default
+        self._index = {label: code for code, label in enumerate(self.labels)}
+        self._weights = dict(weights)
+        # Shared by every engine in the process; treat as read-only
+        self.weight_of = _DefaultWeights(weights, default)
+        self.values = np.array([*self._weights.values(), default], dtype=np.float64)
+        self.values.flags.writeable = False
+
+    def __getitem__(self, label: str) -> float:
+        return self._weights[label]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.labels)
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def get(self, label: str, default: Any = None) -> Any:
+        return self._weights.get(label, default)
+
+    def weight(self, label: str) -> float:
+        """Weight of one label, or the table default"""
+        return self.weight_of[label]
+
+    def codes(self, labels: Any) -> np.ndarray:
+        """Code of every label in a column; unknown labels get the default's code"""
+        unknown = len(self.labels)
+        if isinstance(labels, np.ndarray) and labels.dtype != object:
+            # Fixed-width string columns compare against each label in C
+            codes = np.full(len(labels), unknown, dtype=np.intp)
+            for code, label in enumerate(self.labels):
+                codes[labels == label] = code
+            return codes
+        return np.fromiter(map(self._index.get, labels, repeat(unknown)), dtype=np.intp, count=len(labels))
+
+    def lookup(self, labels: Any) -> np.ndarray:
+        """Weight of every label in a column"""
+        return self.values[self.codes(labels)]
+
+
+@dataclass(frozen=True, eq=False)
+class ScoringWeights:
+    """
+    One immutable weight set. A reload swaps in a whole new set, so a lookup never sees
+    half of one version and half of another. fingerprint hashes the content, for cache keys.
+    """
+
+    version: str
+    fingerprint: str
+    breach_severity: WeightTable
+    data_types: WeightTable
+    social_exposure: WeightTable
+    risk_level_multiplier: WeightTable
+    recency_multiplier: WeightTable
+    source: Optional[str] = None
+    # Recency multiplier indexed by RECENCY_BUCKETS position
+    recency_by_bucket: Tuple[float, ...] = field(init=False)
+    recency_array: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        by_bucket = tuple(self.recency_multiplier[bucket] for bucket in RECENCY_BUCKETS)
+        recency_array = np.array(by_bucket, dtype=np.float64)
+        recency_array.flags.writeable = False
+        object.__setattr__(self, 'recency_by_bucket', by_bucket)
+        object.__setattr__(self, 'recency_array', recency_array)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], source: Optional[str] = None) -> 'ScoringWeights':
+        missing = [bucket for bucket in RECENCY_BUCKETS if bucket not in config['recency_multiplier']]
+        if missing:
+            raise ValueError(f"Weights config has no recency multiplier for {', '.join(missing)}")
+        tables = {
+            name: WeightTable(config[name]['weights'], config[name]['default'])
+            for name in WEIGHT_TABLES
+        }
+        return cls(
+            version=str(config.get('version', 'unversioned')),
+            fingerprint=hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:12],
+            recency_multiplier=WeightTable(config['recency_multiplier'], 1.0),
+            source=source,
+            **tables
+        )
+
+    def __getitem__(self, name: str) -> WeightTable:
+        """Nested-dict style access (weights['data_types']['ssn']) for older callers"""
+        if name not in WEIGHT_TABLES and name != 'recency_multiplier':
+            raise KeyError(name)
+        return getattr(self, name)
+
+    def recency_multipliers(self, recency: np.ndarray) -> np.ndarray:
+        """Multiplier for each RECENCY_BUCKETS index in an array"""
+        return self.recency_array[recency]
+
+
+def load_weights(path: Optional[str] = None) -> ScoringWeights:
+    """Load a weights config; unchanged files come back as the same shared object"""
+    path = os.path.abspath(path or DEFAULT_WEIGHTS_PATH)
+    stat = os.stat(path)
+    key = (path, stat.st_mtime_ns, stat.st_size)
+    cached = _loaded_weights.get(key)
+    if cached is not None:
+        return cached
+
+    with open(path) as f:
+        weights = ScoringWeights.from_config(json.load(f), source=path)
+    with _lock:
+        return _loaded_weights.setdefault(key, weights)
+
+
+def current_weights() -> ScoringWeights:
+    """The process-wide weight set engines use unless given their own"""
+    if _current is None:
+        reload_weights()
+    return _current
+
+
+def use_weights(weights: ScoringWeights) -> ScoringWeights:
+    """Make a weight set the process-wide default; returns the previous one"""
+    global _current
+    with _lock:
+        previous, _current = _current, weights
+    return previous
+
+
+def reload_weights(path: Optional[str] = None) -> ScoringWeights:
+    """
+    Re-read the config (default: the current set's source) and swap it in. Calls in
+    flight finish on the set they started with; a file that has not changed is not re-parsed.
+    """
+    if path is None and _current is not None:
+        path = _current.source
+    weights = load_weights(path)
+    use_weights(weights)
+    return weights
+
+
+if __name__ == "__main__":
+    weights = current_weights()
+    print(f"Weights {weights.version} ({weights.fingerprint}) from {weights.source}")
+    for name in WEIGHT_TABLES:
+        print(f"  {name}: {dict(weights[name])} default={weights[name].default}")
+    print(f"  recency_multiplier: {dict(weights.recency_multiplier)}")
@@ -0,0 +1,153 @@
+"""
+DigitalRiskAnalyzer.calculate_risk_score_async against stub sources with injected latency
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from ai_risk_model import DigitalRiskAnalyzer
+from model_registry import ModelRegistry
+
+STUB_FINDINGS = {
+    "breaches": [{"site": "Stub (2024)", "date": "2024", "data_types": ["Email", "Password"]}],
+    "social_exposures": [],
+    "dark_web_mentions": [{"source": "Stub Forum", "date": "2024-01-15", "context": "Credential dump", "severity": "High"}]
+}
+
+
+@pytest.fixture(scope="module")
+def registry(tmp_path_factory):
+    registry = ModelRegistry(str(tmp_path_factory.mktemp("registry")))
+    DigitalRiskAnalyzer(registry=registry).train_model(n_samples=500, n_jobs=1)
+    return registry
+
+
+class StubSources:
+    """Per-source latency (seconds) and optional failure, run as coroutines or blocking calls"""
+
+    def __init__(self, latencies, blocking=False, failing=()):
+        self.latencies = latencies
+        self.blocking = blocking
+        self.failing = set(failing)
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _exit(self):
+        with self._lock:
+            self.active -= 1
+
+    def make(self, name):
+        def check(name=name):
+            if name in self.failing:
+                raise RuntimeError(f"{name} unavailable")
+            return STUB_FINDINGS[name]
+
+        if self.blocking:
+            def source(*args):
+                self._enter()
+                try:
+                    time.sleep(self.latencies[name])
+                    return check()
+                finally:
+                    self._exit()
+        else:
+            async def source(*args):
+                self._enter()
+                try:
+                    await asyncio.sleep(self.latencies[name])
+                    return check()
+                finally:
+                    self._exit()
+        return source
+
+
+def stub_analyzer(registry, stubs, **kwargs):
+    analyzer = DigitalRiskAnalyzer(registry=registry, **kwargs)
+    analyzer.check_email_breaches = stubs.make("breaches")
+    analyzer.analyze_social_exposure = stubs.make("social_exposures")
+    analyzer.check_dark_web_mentions = stubs.make("dark_web_mentions")
+    return analyzer
+
+
+def timed_scan(analyzer):
+    start = time.perf_counter()
+    report = asyncio.run(analyzer.calculate_risk_score_async("test@example.com"))
+    return report, time.perf_counter() - start
+
+
+@pytest.mark.parametrize("blocking", [False, True])
+def test_wall_time_is_slowest_source_not_total(registry, blocking):
+    latencies = {"breaches": 0.2, "social_exposures": 0.3, "dark_web_mentions": 0.4}
+    analyzer = stub_analyzer(registry, StubSources(latencies, blocking=blocking))
+    analyzer.load_model()
+
+    report, elapsed = timed_scan(analyzer)
+
+    assert report["degraded_sources"] == {}
+    assert report["breaches"] == STUB_FINDINGS["breaches"]
+    assert report["dark_web_mentions"] == STUB_FINDINGS["dark_web_mentions"]
+    assert max(latencies.values()) <= elapsed < sum(latencies.values())
+
+
+@pytest.mark.parametrize("blocking", [False, True])
+def test_timed_out_source_is_degraded_and_others_kept(registry, blocking):
+    latencies = {"breaches": 0.1, "social_exposures": 0.1, "dark_web_mentions": 1.0}
+    analyzer = stub_analyzer(registry, StubSources(latencies, blocking=blocking),
+                             source_timeouts={"dark_web_mentions": 0.2})
+    analyzer.load_model()
+
+    report, elapsed = timed_scan(analyzer)
+
+    assert report["degraded_sources"] == {"dark_web_mentions": "timeout"}
+    assert report["dark_web_mentions"] == []
+    assert report["breaches"] == STUB_FINDINGS["breaches"]
+    assert 0 <= report["risk_score"] <= 100
+    if not blocking:
+        # The cancelled coroutine does not hold the scan up; a blocking source's thread
+        # is still awaited when asyncio.run shuts down its executor
+        assert elapsed < 0.6
+
+
+def test_failed_source_is_reported_as_partial_result(registry):
+    latencies = {"breaches": 0.05, "social_exposures": 0.05, "dark_web_mentions": 0.05}
+    analyzer = stub_analyzer(registry, StubSources(latencies, failing={"breaches"}))
+
+    report, _ = timed_scan(analyzer)
+
+    assert report["degraded_sources"] == {"breaches": "RuntimeError: breaches unavailable"}
+    assert report["breaches"] == []
+    assert report["dark_web_mentions"] == STUB_FINDINGS["dark_web_mentions"]
+
+
+def test_timed_out_blocking_source_keeps_its_slot(registry):
+    latencies = {"breaches": 0.3, "social_exposures": 0.3, "dark_web_mentions": 0.3}
+    stubs = StubSources(latencies, blocking=True)
+    analyzer = stub_analyzer(registry, stubs, max_concurrent_sources=1,
+                             source_timeouts={"breaches": 0.05, "social_exposures": 1.0, "dark_web_mentions": 1.0})
+    analyzer.load_model()
+
+    report, elapsed = timed_scan(analyzer)
+
+    assert report["degraded_sources"] == {"breaches": "timeout"}
+    # The next source only starts once the timed-out thread has really finished
+    assert stubs.max_active == 1
+    assert elapsed >= sum(latencies.values())
+
+
+def test_analyzer_is_reusable_across_event_loops(registry):
+    latencies = {"breaches": 0.02, "social_exposures": 0.02, "dark_web_mentions": 0.02}
+    # A single slot makes every scan wait on the semaphore, which binds it to a loop
+    analyzer = stub_analyzer(registry, StubSources(latencies), max_concurrent_sources=1)
+
+    for _ in range(2):
+        report, _ = timed_scan(analyzer)
+        assert report["degraded_sources"] == {}
@@ -0,0 +1,61 @@
+"""
+CompiledForest against the scikit-learn forests it is compiled from
+"""
+
+import copy
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+from ai_risk_model import DigitalRiskAnalyzer
+from compiled_forest import CompiledScaler, compile_forest
+from model_registry import ModelRegistry
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X, risk_score = DigitalRiskAnalyzer.generate_training_data(3000, rng)
+    X_test, _ = DigitalRiskAnalyzer.generate_training_data(2000, rng)
+    scaler = StandardScaler().fit(X)
+    return scaler, scaler.transform(X), risk_score, X_test
+
+
+def single_threaded(forest):
+    forest = copy.copy(forest)
+    forest.n_jobs = 1
+    return forest
+
+
+def test_regressor_matches_single_threaded_predict_exactly(data):
+    scaler, X, risk_score, X_test = data
+    forest = RandomForestRegressor(n_estimators=50, min_samples_leaf=5, n_jobs=-1, random_state=0).fit(X, risk_score)
+    compiled = compile_forest(forest)
+    X_scaled = CompiledScaler.from_sklearn(scaler).transform(X_test)
+
+    assert np.array_equal(X_scaled, scaler.transform(X_test))
+    assert np.array_equal(compiled.predict(X_scaled), single_threaded(forest).predict(X_scaled))
+    # Threaded sklearn sums trees in completion order, so only agreement up to rounding holds
+    np.testing.assert_allclose(compiled.predict(X_scaled), forest.predict(X_scaled), rtol=1e-12)
+
+
+def test_classifier_matches_single_threaded_predict_proba_exactly(data):
+    scaler, X, risk_score, X_test = data
+    labels = np.digitize(risk_score, [30, 70])
+    forest = RandomForestClassifier(n_estimators=50, n_jobs=-1, random_state=0).fit(X, labels)
+    compiled = compile_forest(forest)
+    X_scaled = scaler.transform(X_test)
+
+    reference = single_threaded(forest)
+    assert np.array_equal(compiled.predict_proba(X_scaled), reference.predict_proba(X_scaled))
+    assert np.array_equal(compiled.predict(X_scaled), reference.predict(X_scaled))
+
+
+def test_non_forest_models_are_rejected(tmp_path):
+    analyzer = DigitalRiskAnalyzer(registry=ModelRegistry(str(tmp_path)))
+    analyzer.train_model(n_samples=500, model_type="hist_gradient_boosting")
+
+    with pytest.raises(ValueError, match="HistGradientBoostingRegressor"):
+        analyzer.export_compiled_model()
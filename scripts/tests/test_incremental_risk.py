@@ -0,0 +1,49 @@
+"""
+RiskScoreState across a weight reload
+"""
+
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from incremental_risk import IncrementalRiskScorer, RiskScoreState, StaleWeightsError
+from risk_assessment import RiskAssessmentEngine
+from scoring_weights import DEFAULT_WEIGHTS_PATH, ScoringWeights, current_weights, use_weights
+
+TODAY = date(2026, 1, 15)
+BREACHES = [{'severity': 'low', 'data_types': ['email'], 'breach_date': TODAY - timedelta(days=20)}]
+EXPOSURES = [{'exposure_type': 'location_data', 'risk_level': 'high'}]
+NEW_BREACH = {'severity': 'critical', 'data_types': [], 'breach_date': TODAY - timedelta(days=400)}
+
+
+@pytest.fixture
+def reweighted():
+    """A second weight set; the process-wide set is restored afterwards"""
+    with open(DEFAULT_WEIGHTS_PATH) as f:
+        config = json.load(f)
+    config['breach_severity']['weights']['critical'] *= 2
+    previous = use_weights(current_weights())
+    try:
+        yield ScoringWeights.from_config(config)
+    finally:
+        use_weights(previous)
+
+
+def test_state_rejects_updates_after_a_weight_reload(reweighted):
+    scorer = IncrementalRiskScorer(RiskAssessmentEngine())
+    state = RiskScoreState.from_dict(scorer.from_history(BREACHES, EXPOSURES, as_of=TODAY).to_dict())
+    assert state.weights_fingerprint == current_weights().fingerprint
+    old_score = scorer.apply_breach(scorer.from_history(BREACHES, EXPOSURES, as_of=TODAY), NEW_BREACH)
+
+    use_weights(reweighted)
+    with pytest.raises(StaleWeightsError):
+        scorer.apply_breach(state, NEW_BREACH)
+    with pytest.raises(StaleWeightsError):
+        scorer.score(state)
+
+    # A state rebuilt from history takes deltas under the new weights
+    rebuilt = scorer.from_history(BREACHES, EXPOSURES, as_of=TODAY)
+    new_score = scorer.apply_breach(rebuilt, NEW_BREACH)
+    assert new_score == scorer.score(scorer.from_history(BREACHES + [NEW_BREACH], EXPOSURES, as_of=TODAY))
+    assert new_score['breach_score'] > old_score['breach_score']
@@ -0,0 +1,54 @@
+"""
+RiskScoreCoalescer shutdown while callers are still submitting
+"""
+
+import threading
+
+import pytest
+
+from ai_risk_model import DigitalRiskAnalyzer
+from model_registry import ModelRegistry
+from risk_coalescer import RiskScoreCoalescer
+
+FEATURES = [2, 30, 5.0, 2, 0, 1, 25.0, 30.0]
+
+
+@pytest.fixture(scope="module")
+def analyzer(tmp_path_factory):
+    analyzer = DigitalRiskAnalyzer(registry=ModelRegistry(str(tmp_path_factory.mktemp("registry"))))
+    analyzer.train_model(n_samples=500, n_jobs=1)
+    return analyzer
+
+
+def test_close_during_submit_never_strands_a_caller(analyzer):
+    coalescer = RiskScoreCoalescer(analyzer, max_wait_ms=0.5).start()
+    outcomes = []
+
+    def client():
+        for _ in range(500):
+            try:
+                outcomes.append(coalescer.submit(FEATURES).result(timeout=10))
+            except RuntimeError:
+                outcomes.append(None)
+                return
+
+    clients = [threading.Thread(target=client) for _ in range(8)]
+    for thread in clients:
+        thread.start()
+    coalescer.close()
+    for thread in clients:
+        thread.join(timeout=30)
+
+    assert not any(thread.is_alive() for thread in clients)
+    assert outcomes.count(None) == len(clients)
+
+
+def test_submit_after_close_raises_until_restarted(analyzer):
+    coalescer = RiskScoreCoalescer(analyzer)
+    with coalescer:
+        first = coalescer.score_findings([], [])
+    with pytest.raises(RuntimeError, match="closed"):
+        coalescer.submit(FEATURES)
+
+    with coalescer:
+        assert coalescer.score_findings([], []) == first
@@ -0,0 +1,38 @@
+"""
+CachedScorer keys and result types
+"""
+
+from datetime import date
+
+from risk_assessment import RiskAssessmentEngine
+from scoring_cache import CachedScorer, SQLiteCacheBackend
+
+BREACHES = [{
+    'breach_name': 'LinkedIn', 'severity': 'high',
+    'data_types': ['email', 'password'], 'breach_date': date(2021, 6, 1)
+}]
+EXPOSURES = [{'platform': 'Twitter', 'exposure_type': 'public_profile', 'risk_level': 'high'}]
+
+
+def test_catalog_ids_and_expanded_text_do_not_share_entries():
+    backend = SQLiteCacheBackend()
+    text_scorer = CachedScorer(RiskAssessmentEngine(expand_recommendations=True), backend=backend)
+    id_scorer = CachedScorer(RiskAssessmentEngine(expand_recommendations=False), backend=backend)
+
+    ids = id_scorer.calculate_overall_risk(BREACHES, EXPOSURES)
+    text = text_scorer.calculate_overall_risk(BREACHES, EXPOSURES)
+
+    assert text_scorer.stats()['misses'] == 1
+    assert ids['recommendations'][0] == 'privacy.breach.change_passwords'
+    assert text['recommendations'][0] != ids['recommendations'][0]
+
+
+def test_miss_and_hit_return_the_same_types():
+    scorer = CachedScorer(RiskAssessmentEngine(expand_recommendations=False))
+
+    miss = scorer.calculate_overall_risk(BREACHES, EXPOSURES)
+    hit = scorer.calculate_overall_risk(BREACHES, EXPOSURES)
+
+    assert scorer.stats()['local_hits'] == 1
+    assert miss == hit
+    assert type(miss['recommendations']) is type(hit['recommendations']) is list